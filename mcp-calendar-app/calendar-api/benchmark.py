@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Concurrent GET throughput benchmark for the calendar API
+"""
+
+import argparse
+import datetime
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import requests
+
+def run_clients(url, concurrency, duration):
+    """Hammer `url` from `concurrency` threads for `duration` seconds"""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client():
+        session = requests.Session()
+        local_latencies = []
+        local_errors = 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = session.get(url)
+                response.raise_for_status()
+                response.content
+                local_latencies.append(time.perf_counter() - start)
+            except requests.RequestException:
+                local_errors += 1
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000 if latencies else 0.0,
+    }
+
+def serve(mode, port):
+    """Start a local server in sync or async mode and wait until it answers"""
+    env = dict(os.environ, CALENDAR_API_ASYNC='true' if mode == 'async' else 'false')
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'server:app', '--host', '127.0.0.1', '--port', str(port),
+         '--log-level', 'warning', '--backlog', '4096'],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=env)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            requests.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return process
+        except requests.RequestException:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"{mode} server did not start on port {port}")
+
+def report(label, url, levels, duration):
+    print(f"\n📈 {label}: GET {url}")
+    print(f"{'clients':>8} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for concurrency in levels:
+        r = run_clients(url, concurrency, duration)
+        print(f"{concurrency:>8} {r['requests']:>9} {r['errors']:>7} {r['rps']:>9.1f} {r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f}")
+
+def time_cases(title, cases, repeat):
+    print(f"\n📈 {title} (in-process, {repeat} runs each)")
+    print(f"{'query':<20} {'mean ms':>9} {'min ms':>9}")
+    for label, run in cases:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"{label:<20} {statistics.mean(timings):>9.2f} {min(timings):>9.2f}")
+
+def bench_database(m, path, rows):
+    """A database at `path` holding `rows`, with the server's indexes"""
+    import database_handler
+
+    table_name = m.info['table_name']
+    dbh = database_handler.DatabaseHandler(db_name=path, pooled=True)
+    dbh.migrate_schema(table_name, m.columns, m.info.getint('schema_version', fallback=1))
+    for index_name, index_columns in json.loads(m.info.get('indexes', '{}')).items():
+        dbh.create_index(table_name, index_name, index_columns)
+    dbh.insert_many(table_name, rows, conflict_key='sid')
+    dbh.create_window_index(table_name)
+    dbh.create_series_index(table_name)
+    return dbh
+
+def bench_row(sid, start, end, rrule=None):
+    return {'sid': sid, 'name': f'Event {sid}', 'content': '', 'category': 'Lecture', 'level': 2, 'status': 0.0,
+            'creation_time': '2025-01-01 00:00:00', 'start_time': str(start), 'end_time': str(end),
+            'rrule': rrule, 'exdates': None, 'series_end': None}
+
+def brute_force_conflicts(rows, window_start):
+    """Count overlapping pairs by comparing every pair: the reference for Method.conflicts"""
+    rows = [r for r in rows if r['end_time'] > window_start]
+    return sum(1 for i, a in enumerate(rows) for b in rows[i + 1:]
+               if a['start_time'] < b['end_time'] and b['start_time'] < a['end_time'])
+
+def interval_benchmark(count, repeat=5):
+    """Time free/busy and conflict detection in-process on a temporary database of `count` random events"""
+    import method
+    import recurrence
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    m = method.Method(conf_file=os.path.join(here, 'db.conf'))
+    with tempfile.TemporaryDirectory() as directory:
+        # A year of events starting on the quarter hour during the day, 15 minutes to 3 hours long,
+        # plus zero-length deadlines and a few weekly series
+        year = datetime.datetime(2025, 1, 1)
+        rows = []
+        for i in range(count):
+            start = year + datetime.timedelta(days=random.randrange(365), minutes=random.randrange(7 * 4, 21 * 4) * 15)
+            end = start + datetime.timedelta(minutes=random.choice([0, 15, 30, 60, 90, 180]))
+            rows.append(bench_row(f'bench-{i}', start, end))
+        for i in range(max(count // 1000, 10)):
+            start = year + datetime.timedelta(days=random.randrange(7), minutes=random.randrange(7 * 4, 21 * 4) * 15)
+            row = bench_row(f'series-{i}', start, start + datetime.timedelta(minutes=random.choice([0, 60])),
+                            'FREQ=WEEKLY;COUNT=52')
+            row['series_end'] = recurrence.series_end(row['rrule'], row['start_time'], row['end_time'])
+            rows.append(row)
+        dbh = bench_database(m, os.path.join(directory, 'bench'), rows)
+
+        # The sweep line must agree with comparing every pair
+        check = ('2025-06-01 00:00:00', '2025-06-08 00:00:00')
+        expected = brute_force_conflicts(m.schedules(dbh, check, order='start_time'), check[0])
+        found = m.conflicts(dbh, check)['total']
+        if found != expected:
+            raise SystemExit(f"❌ conflicts found {found} overlapping pairs in {check}, brute force {expected}")
+        print(f"✅ conflicts agree with brute force: {found} overlapping pairs in one week")
+
+        hours = m.check_hours('09:00', '17:00')
+        cases = [
+            ('free/busy, 1 week', lambda: m.free_busy(dbh, ('2025-06-02 00:00:00', '2025-06-09 00:00:00'), 90, hours, True)),
+            ('free/busy, 1 month', lambda: m.free_busy(dbh, ('2025-06-01 00:00:00', '2025-07-01 00:00:00'), 90, hours, True)),
+            ('free/busy, 1 year', lambda: m.free_busy(dbh, ('2025-01-01 00:00:00', '2026-01-01 00:00:00'), 90, hours, True, 1000)),
+            ('conflicts, 1 month', lambda: m.conflicts(dbh, ('2025-06-01 00:00:00', '2025-07-01 00:00:00'))),
+            ('conflicts, 1 year', lambda: m.conflicts(dbh, ('2025-01-01 00:00:00', '2026-01-01 00:00:00'))),
+        ]
+        time_cases(f"Interval queries over {count} events", cases, repeat)
+
+def series_benchmark(count, weeks=15, repeat=5):
+    """Compare `count` weekly courses stored as one row per occurrence and as one recurring series each"""
+    import method
+    import recurrence
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    m = method.Method(conf_file=os.path.join(here, 'db.conf'))
+    semester = datetime.datetime(2025, 9, 1)
+    with tempfile.TemporaryDirectory() as directory:
+        expanded, series = [], []
+        for i in range(count):
+            start = semester + datetime.timedelta(days=random.randrange(5), minutes=random.randrange(8 * 4, 18 * 4) * 15)
+            end = start + datetime.timedelta(minutes=90)
+            for week in range(weeks):
+                shift = datetime.timedelta(weeks=week)
+                expanded.append(bench_row(f'course-{i}-{week}', start + shift, end + shift))
+            row = bench_row(f'course-{i}', start, end, f'FREQ=WEEKLY;COUNT={weeks}')
+            row['series_end'] = recurrence.series_end(row['rrule'], row['start_time'], row['end_time'])
+            series.append(row)
+
+        week = ('2025-10-06 00:00:00', '2025-10-13 00:00:00')
+        term = ('2025-09-01 00:00:00', '2026-01-01 00:00:00')
+        for label, rows in [('one row per occurrence', expanded), ('one row per series', series)]:
+            path = os.path.join(directory, label.replace(' ', '-'))
+            dbh = bench_database(m, path, rows)
+            dbh.conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            size = os.path.getsize(f'{path}.db') / 1e6
+            cases = [
+                ('list 1 week', lambda: m.schedules(dbh, week, order='start_time')),
+                ('list semester', lambda: m.schedules(dbh, term, order='start_time')),
+                ('list all rows', lambda: m.schedules(dbh)),
+                ('stats 1 week', lambda: m.stats(dbh, week)),
+                ('free/busy 1 week', lambda: m.free_busy(dbh, week)),
+            ]
+            time_cases(f"{count} weekly courses x {weeks} weeks, {label}: {len(rows)} rows, {size:.1f} MB", cases, repeat)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Calendar API base URL")
+    parser.add_argument("--path", default="/schedules", help="Endpoint to GET (may include a query string)")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated client counts")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per concurrency level")
+    parser.add_argument("--serve", help="Comma-separated modes (sync,async) to start locally and compare, "
+                                        "instead of benchmarking the server at --url")
+    parser.add_argument("--port", type=int, default=8765, help="Port for servers started with --serve")
+    parser.add_argument("--intervals", type=int, metavar="N",
+                        help="Instead, time free/busy and conflict detection on a temporary database of N events")
+    parser.add_argument("--series", type=int, metavar="N",
+                        help="Instead, compare N weekly courses stored per occurrence and as recurring series")
+    args = parser.parse_args()
+
+    if args.intervals:
+        interval_benchmark(args.intervals)
+        return
+    if args.series:
+        series_benchmark(args.series)
+        return
+
+    levels = [int(c) for c in args.concurrency.split(',')]
+    if not args.serve:
+        report("Benchmark", f"{args.url}{args.path}", levels, args.duration)
+        return
+
+    for mode in args.serve.split(','):
+        process = serve(mode, args.port)
+        try:
+            report(f"{mode} mode", f"http://127.0.0.1:{args.port}{args.path}", levels, args.duration)
+        finally:
+            process.terminate()
+            process.wait()
+
+if __name__ == '__main__':
+    main()
@@ -14,6 +14,9 @@ def build_db():
     db_name = info.get('db_name')
     table_name = info.get('table_name')
     columns = json.loads(info.get('columns', '{}'))
+    indexes = json.loads(info.get('indexes', '{}'))
+    search_columns = json.loads(info.get('search_columns', '{}'))
+    schema_version = info.getint('schema_version', fallback=1)
 
     if not db_name or not table_name or not columns:
         raise ValueError("Database configuration is incomplete.")
@@ -34,11 +37,13 @@ def build_db():
             connection.close()
 
             if table_exists:
-                print(f"Table '{table_name}' already exists. No action needed.")
-                return
+                print(f"Table '{table_name}' already exists.")
+                if dbh.migrate_schema(table_name=table_name, columns=columns, version=schema_version):
+                    print(f"Migrated table '{table_name}' to schema version {schema_version}.")
             else:
                 print(f"Table '{table_name}' does not exist. Creating table...")
                 dbh.create_table(table_name=table_name, columns=columns)
+                dbh.set_schema_version(schema_version)
 
         except Exception as e:
             print(f"An error occurred while checking the table existence: {e}")
@@ -48,6 +53,18 @@ def build_db():
         print(f"Database file '{db_path}' does not exist. Creating database and table...")
         dbh = database_handler.DatabaseHandler(db_name=db_name)
         dbh.create_table(table_name=table_name, columns=columns)
+        dbh.set_schema_version(schema_version)
+
+    print(f"Ensuring indexes on '{table_name}'...")
+    for index_name, index_columns in indexes.items():
+        dbh.create_index(table_name=table_name, index_name=index_name, columns=index_columns)
+    dbh.create_window_index(table_name=table_name)
+    dbh.create_series_index(table_name=table_name)
+    if search_columns:
+        print(f"Rebuilding full-text search index on '{table_name}'...")
+        dbh.create_search_index(table_name=table_name, columns=list(search_columns), rebuild=True)
+    print(f"Ensuring change log on '{table_name}'...")
+    dbh.create_change_log(table_name=table_name, columns=list(columns), keep=info.getint('change_log_size', fallback=100000))
 
 if __name__ == '__main__':
     build_db()
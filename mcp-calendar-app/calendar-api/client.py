@@ -25,9 +25,29 @@ class Interface:
         headers = {'Content-Type': 'application/json'}
         return self._make_request("PUT", endpoint=sid, headers=headers, data=json.dumps(data))
 
+    def patch(self, sid, data):
+        headers = {'Content-Type': 'application/json'}
+        return self._make_request("PATCH", endpoint=sid, headers=headers, data=json.dumps(data))
+
     def delete(self, sid):
         return self._make_request("DELETE", endpoint=sid)
 
+    def post_many(self, data_list):
+        headers = {'Content-Type': 'application/json'}
+        return self._make_request("POST", endpoint="bulk", headers=headers, data=json.dumps(data_list))
+
+    def update_many(self, data_list):
+        headers = {'Content-Type': 'application/json'}
+        return self._make_request("PUT", endpoint="bulk", headers=headers, data=json.dumps(data_list))
+
+    def delete_many(self, sids):
+        headers = {'Content-Type': 'application/json'}
+        return self._make_request("POST", endpoint="bulk/delete", headers=headers, data=json.dumps({"sids": sids}))
+
+    def changes(self, since=None, limit=1000):
+        params = {"limit": limit} if since is None else {"since": since, "limit": limit}
+        return self._make_request("GET", endpoint="changes", params=params)
+
 if __name__ == '__main__':
     url = "http://127.0.0.1:8000"
     i = Interface(url, 'schedules')
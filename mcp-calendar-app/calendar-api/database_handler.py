@@ -1,51 +1,336 @@
+import asyncio
+import functools
 import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 class DatabaseHandler:
-    def __init__(self, db_name: str, check_same_thread: bool = True):
+    def __init__(self, db_name: str, check_same_thread: bool = True, pooled: bool = False):
         self.db_name = db_name
-        self.conn = sqlite3.connect(f'{db_name}.db', check_same_thread=check_same_thread)
+        self.pooled = pooled
+        # In pooled mode the writer connection is shared by every worker thread,
+        # so it must not be pinned to the thread that created it
+        self.conn = sqlite3.connect(f'{db_name}.db', check_same_thread=check_same_thread and not pooled)
         self.c = self.conn.cursor()
+        self.write_lock = threading.RLock()
+        self.local = threading.local()
+        if pooled:
+            # WAL lets readers run alongside the single writer without blocking
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+
+    def reader(self):
+        # One read-only connection per worker thread, opened on first use
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(f'{self.db_name}.db')
+            conn.execute('PRAGMA query_only=ON')
+            self.local.conn = conn
+        return conn
 
     def execute(self, cmd: str, params=()):
+        with self.write_lock:
+            try:
+                self.c.execute(cmd, params)
+                self.conn.commit()
+                return self.c.rowcount
+            except sqlite3.Error as e:
+                self.conn.rollback()
+                print(f"An error occurred: {e}")
+                return 0
+
+    def execute_batch(self, statements: list):
+        # Several (cmd, params) statements in one transaction; False if any failed
+        with self.write_lock:
+            try:
+                for cmd, params in statements:
+                    self.c.execute(cmd, params)
+                self.conn.commit()
+                return True
+            except sqlite3.Error as e:
+                self.conn.rollback()
+                print(f"An error occurred: {e}")
+                return False
+
+    def execute_many(self, cmd: str, seq_of_params):
+        # All rows go in one transaction: either every row is written or none
+        with self.write_lock:
+            try:
+                self.c.executemany(cmd, seq_of_params)
+                self.conn.commit()
+                return True
+            except sqlite3.Error as e:
+                self.conn.rollback()
+                print(f"An error occurred: {e}")
+                return False
+
+    def query(self, cmd: str, params=()):
+        if not self.pooled:
+            # The shared cursor's results must be read before anyone reuses it
+            with self.write_lock:
+                self.execute(cmd, params)
+                columns = [description[0] for description in self.c.description] if self.c.description else []
+                return columns, self.c.fetchall()
         try:
-            self.c.execute(cmd, params)
-            self.conn.commit()
+            cursor = self.reader().execute(cmd, params)
         except sqlite3.Error as e:
             print(f"An error occurred: {e}")
+            return [], []
+        columns = [description[0] for description in cursor.description] if cursor.description else []
+        return columns, cursor.fetchall()
 
     def create_table(self, table_name: str, columns: dict):
         columns_str = ', '.join([f"{k} {v}" for k, v in columns.items()])
         cmd = f'CREATE TABLE IF NOT EXISTS {table_name} ({columns_str})'
         self.execute(cmd)
 
-    def insert_data(self, table_name: str, columns: dict, data: dict):
+    def table_exists(self, table_name: str):
+        rows = self.query("SELECT count(*) FROM sqlite_master WHERE type='table' AND name=?", (table_name,))[1]
+        return rows[0][0] == 1
+
+    def schema_version(self):
+        return self.query('PRAGMA user_version')[1][0][0]
+
+    def set_schema_version(self, version: int):
+        self.execute(f'PRAGMA user_version = {int(version)}')
+
+    def table_columns(self, table_name: str):
+        return [row[1] for row in self.query(f'PRAGMA table_info({table_name})')[1]]
+
+    def migrate_schema(self, table_name: str, columns: dict, version: int):
+        # Rebuild an older table with the configured column definitions (e.g.
+        # sid TEXT PRIMARY KEY) and copy the rows across. Columns the old table
+        # lacks start out NULL. Indexes and triggers go with the old table, so
+        # callers recreate them afterwards.
+        # Returns True when rows were copied and rowids therefore changed.
+        if self.schema_version() >= version:
+            return False
+        if not self.table_exists(table_name):
+            self.create_table(table_name, columns)
+            self.set_schema_version(version)
+            return False
+        columns_str = ', '.join([f"{k} {v}" for k, v in columns.items()])
+        existing = self.table_columns(table_name)
+        names = ', '.join(k for k in columns if k in existing)
+        # Rows repeating an existing primary key are dropped by the copy (the
+        # first one wins), so find them first to report what goes
+        key = next((k for k, v in columns.items() if 'PRIMARY KEY' in v.upper() and k in existing), None)
+        duplicates = []
+        if key:
+            duplicates = self.query(f'SELECT {key}, COUNT(*) FROM {table_name} GROUP BY {key} HAVING COUNT(*) > 1')[1]
+        with self.write_lock:
+            before = self.conn.execute(f'SELECT COUNT(*) FROM {table_name}').fetchone()[0]
+            try:
+                self.conn.executescript(f"""
+                    BEGIN;
+                    CREATE TABLE {table_name}_migrate ({columns_str});
+                    INSERT OR IGNORE INTO {table_name}_migrate ({names}) SELECT {names} FROM {table_name} ORDER BY rowid;
+                    DROP TABLE {table_name};
+                    ALTER TABLE {table_name}_migrate RENAME TO {table_name};
+                    PRAGMA user_version = {int(version)};
+                    COMMIT;
+                """)
+            except sqlite3.Error as e:
+                self.conn.rollback()
+                print(f"An error occurred: {e}")
+                raise
+            after = self.conn.execute(f'SELECT COUNT(*) FROM {table_name}').fetchone()[0]
+        if after < before:
+            print(f"Migrating '{table_name}' to schema version {version} dropped {before - after} of {before} rows "
+                  f"repeating a {key or 'unique value'}; the first row of each was kept: "
+                  f"{', '.join(f'{value} ({count - 1} dropped)' for value, count in duplicates)}")
+        return True
+
+    def create_index(self, table_name: str, index_name: str, columns: list):
+        cmd = f'CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({", ".join(columns)})'
+        self.execute(cmd)
+
+    def create_window_index(self, table_name: str):
+        # Track the longest event duration so window queries can bound the
+        # start_time index range on both sides instead of scanning from the
+        # beginning of the table. Triggers keep it current for every writer;
+        # deletes leave it as a safe upper bound.
+        span = "strftime('%s', {0}end_time) - strftime('%s', {0}start_time)"
+        self.execute(f'CREATE TABLE IF NOT EXISTS {table_name}_span '
+                     f'(id INTEGER PRIMARY KEY CHECK (id = 0), max_seconds INTEGER NOT NULL)')
+        self.execute(f'INSERT OR IGNORE INTO {table_name}_span (id, max_seconds) '
+                     f'SELECT 0, COALESCE(MAX({span.format("")}), 0) FROM {table_name}')
+        for event, name in [('INSERT', 'insert'), ('UPDATE OF start_time, end_time', 'update')]:
+            self.execute(f'CREATE TRIGGER IF NOT EXISTS {table_name}_span_{name} AFTER {event} ON {table_name} '
+                         f'BEGIN UPDATE {table_name}_span '
+                         f'SET max_seconds = MAX(max_seconds, COALESCE({span.format("NEW.")}, 0)); END')
+
+    def create_series_index(self, table_name: str):
+        # Partial index over just the master rows of recurring series, so
+        # finding the series in a window costs O(series), however many one-off
+        # rows the table holds
+        self.execute(f'CREATE INDEX IF NOT EXISTS idx_{table_name}_series ON {table_name} (start_time) '
+                     f'WHERE rrule IS NOT NULL')
+
+    def create_change_log(self, table_name: str, columns: list, keep: int = 100000):
+        # Append-only log of every write to the table. Triggers add the entries
+        # inside the writing transaction, so the log can't miss or invent a
+        # change, whichever code path (or process) wrote. AUTOINCREMENT keeps
+        # sequence numbers increasing even after old entries are pruned.
+        log = f'{table_name}_changes'
+        pairs = ', '.join(f"'{c}', NEW.{c}" for c in columns)
+        new_row = f'json_object({pairs})'
+        self.execute(f'CREATE TABLE IF NOT EXISTS {log} (seq INTEGER PRIMARY KEY AUTOINCREMENT, '
+                     f'sid TEXT NOT NULL, op TEXT NOT NULL, changed_at TEXT NOT NULL, data TEXT)')
+        upsert = (f"INSERT INTO {log} (sid, op, changed_at, data) "
+                  f"VALUES (NEW.sid, 'upsert', datetime('now'), {new_row});")
+        # Triggers are recreated so that a changed column list or retention takes effect
+        for name in ['insert', 'update', 'delete', 'prune']:
+            self.execute(f'DROP TRIGGER IF EXISTS {log}_{name}')
+        self.execute(f'CREATE TRIGGER {log}_insert AFTER INSERT ON {table_name} BEGIN {upsert} END')
+        # A PUT may change the sid itself, which deletes the old one
+        self.execute(f'CREATE TRIGGER {log}_update AFTER UPDATE ON {table_name} BEGIN '
+                     f"INSERT INTO {log} (sid, op, changed_at, data) SELECT OLD.sid, 'delete', datetime('now'), NULL "
+                     f'WHERE OLD.sid IS NOT NEW.sid; {upsert} END')
+        self.execute(f'CREATE TRIGGER {log}_delete AFTER DELETE ON {table_name} BEGIN '
+                     f"INSERT INTO {log} (sid, op, changed_at, data) VALUES (OLD.sid, 'delete', datetime('now'), NULL); END")
+        # Keep the newest `keep` entries, trimming in steps of 1000 rather than on every write
+        self.execute(f'CREATE TRIGGER {log}_prune AFTER INSERT ON {log} WHEN NEW.seq % 1000 = 0 '
+                     f'BEGIN DELETE FROM {log} WHERE seq <= NEW.seq - {int(keep)}; END')
+
+    def create_search_index(self, table_name: str, columns: list, rebuild: bool = False):
+        # External-content FTS5 index over the text columns, keyed on the
+        # calendar rowid and kept in sync by triggers so every writer updates it
+        fts = f'{table_name}_fts'
+        cols = ', '.join(columns)
+        new_cols = ', '.join(f'NEW.{c}' for c in columns)
+        old_cols = ', '.join(f'OLD.{c}' for c in columns)
+        existed = self.table_exists(fts)
+        self.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, "
+                     f"content='{table_name}', prefix='2 3', tokenize='unicode61 remove_diacritics 2')")
+        self.execute(f'CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table_name} '
+                     f'BEGIN INSERT INTO {fts} (rowid, {cols}) VALUES (NEW.rowid, {new_cols}); END')
+        self.execute(f'CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table_name} '
+                     f"BEGIN INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', OLD.rowid, {old_cols}); END")
+        self.execute(f'CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF {cols} ON {table_name} '
+                     f"BEGIN INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', OLD.rowid, {old_cols}); "
+                     f'INSERT INTO {fts} (rowid, {cols}) VALUES (NEW.rowid, {new_cols}); END')
+        # Populate from existing rows the first time, or on request (e.g. after a VACUUM)
+        if rebuild or not existed:
+            self.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+    def insert_sql(self, table_name: str, data: dict, conflict_key: str = None):
         placeholders = ', '.join('?' for _ in data)
         cmd = f'INSERT INTO {table_name} ({", ".join(data.keys())}) VALUES ({placeholders})'
-        self.execute(cmd, tuple(data.values()))
+        if conflict_key:
+            # Let the unique index decide existence; rowcount is 0 when the key was taken
+            cmd += f' ON CONFLICT({conflict_key}) DO NOTHING'
+        return cmd, tuple(data.values())
 
-    def update_data(self, table_name: str, data: dict, condition: dict):
+    def insert_data(self, table_name: str, columns: dict, data: dict, conflict_key: str = None):
+        return self.execute(*self.insert_sql(table_name, data, conflict_key))
+
+    def insert_many(self, table_name: str, rows: list, conflict_key: str = None):
+        keys = list(rows[0].keys())
+        cmd = f'INSERT INTO {table_name} ({", ".join(keys)}) VALUES ({", ".join("?" for _ in keys)})'
+        if conflict_key:
+            cmd += f' ON CONFLICT({conflict_key}) DO NOTHING'
+        return self.execute_many(cmd, [tuple(row[k] for k in keys) for row in rows])
+
+    def update_sql(self, table_name: str, data: dict, condition: dict):
         data_str = ', '.join([f"{k} = ?" for k in data.keys()])
         cond_str = ' AND '.join([f"{k} = ?" for k in condition.keys()])
         cmd = f'UPDATE {table_name} SET {data_str} WHERE {cond_str}'
-        self.execute(cmd, tuple(data.values()) + tuple(condition.values()))
+        return cmd, tuple(data.values()) + tuple(condition.values())
+
+    def update_data(self, table_name: str, data: dict, condition: dict):
+        return self.execute(*self.update_sql(table_name, data, condition))
+
+    def update_returning(self, table_name: str, data: dict, condition: dict):
+        # Update and read back the merged row in one statement; None if nothing matched
+        data_str = ', '.join([f"{k} = ?" for k in data.keys()])
+        cond_str = ' AND '.join([f"{k} = ?" for k in condition.keys()])
+        params = tuple(data.values()) + tuple(condition.values())
+        with self.write_lock:
+            try:
+                if sqlite3.sqlite_version_info >= (3, 35):
+                    self.c.execute(f'UPDATE {table_name} SET {data_str} WHERE {cond_str} RETURNING *', params)
+                    row = self.c.fetchone()
+                else:
+                    # No RETURNING before SQLite 3.35; the write lock keeps the read consistent
+                    self.c.execute(f'UPDATE {table_name} SET {data_str} WHERE {cond_str}', params)
+                    row = None
+                    if self.c.rowcount > 0:
+                        self.c.execute(f'SELECT * FROM {table_name} WHERE {cond_str}', tuple(condition.values()))
+                        row = self.c.fetchone()
+                # Without a matching row the fallback has no result set to describe
+                columns = [description[0] for description in self.c.description] if row else []
+                self.conn.commit()
+            except Exception as e:
+                # Never leave the shared writer inside an open transaction
+                self.conn.rollback()
+                print(f"An error occurred: {e}")
+                if not isinstance(e, sqlite3.Error):
+                    raise
+                return None
+        return dict(zip(columns, row)) if row else None
+
+    def update_many(self, table_name: str, rows: list, key: str):
+        keys = list(rows[0].keys())
+        cmd = f'UPDATE {table_name} SET {", ".join(f"{k} = ?" for k in keys)} WHERE {key} = ?'
+        return self.execute_many(cmd, [tuple(row[k] for k in keys) + (row[key],) for row in rows])
 
     def delete_data(self, table_name: str, condition: dict):
         cond_str = ' AND '.join([f"{k} = ?" for k in condition.keys()])
         cmd = f'DELETE FROM {table_name} WHERE {cond_str}'
-        self.execute(cmd, tuple(condition.values()))
-
-    def fetch_data(self, table_name: str, condition: dict = None):
-        if condition:
-            cond_str = ' AND '.join([f"{k} = ?" for k in condition.keys()])
-            cmd = f'SELECT * FROM {table_name} WHERE {cond_str}'
-            self.execute(cmd, tuple(condition.values()))
-        else:
-            cmd = f'SELECT * FROM {table_name}'
-            self.execute(cmd)
-        
-        # Get column names
-        columns = [description[0] for description in self.c.description] if self.c.description else []
-        rows = self.c.fetchall()
+        return self.execute(cmd, tuple(condition.values()))
+
+    def delete_many(self, table_name: str, key: str, values: list):
+        cmd = f'DELETE FROM {table_name} WHERE {key} = ?'
+        return self.execute_many(cmd, [(v,) for v in values])
+
+    def where(self, table_name: str, condition: dict = None, window: tuple = None, ranges: list = None):
+        clauses = [f"{k} = ?" for k in condition.keys()] if condition else []
+        params = list(condition.values()) if condition else []
+        for column, op, value in ranges or []:
+            clauses.append(f"{column} {op} ?")
+            params.append(value)
+        if window:
+            # Overlap test: the event must end at or after the window opens and
+            # start before it closes. No event is longer than the tracked span,
+            # so start_time is also bounded below and the index range stays tight.
+            # Recurring series are expanded separately (see fetch_series): their
+            # master row only holds the first occurrence.
+            start, end = window
+            clauses.append("rrule IS NULL")
+            if start:
+                clauses.append(f"start_time >= datetime(?, (SELECT '-' || max_seconds || ' seconds' "
+                               f"FROM {table_name}_span))")
+                clauses.append("end_time >= ?")
+                params += [start, start]
+            if end:
+                clauses.append("start_time < ?")
+                params.append(end)
+        return clauses, params
+
+    def select(self, table_name: str, condition: dict = None, window: tuple = None, ranges: list = None,
+               order: str = None, descending: bool = False, after: tuple = None, limit: int = None):
+        clauses, params = self.where(table_name, condition, window, ranges)
+        if window:
+            order = order or 'start_time'
+        if after:
+            # Keyset pagination: resume strictly past the last (order, sid) seen
+            clauses.append(f"({order}, sid) {'<' if descending else '>'} (?, ?)")
+            params += list(after)
+
+        cmd = f'SELECT * FROM {table_name}'
+        if clauses:
+            cmd += f' WHERE {" AND ".join(clauses)}'
+        if order:
+            direction = 'DESC' if descending else 'ASC'
+            cmd += f' ORDER BY {order} {direction}, sid {direction}'
+        if limit:
+            cmd += ' LIMIT ?'
+            params.append(limit)
+        return cmd, tuple(params)
+
+    def fetch_data(self, table_name: str, condition: dict = None, **kwargs):
+        columns, rows = self.query(*self.select(table_name, condition, **kwargs))
         
         # Convert to list of dictionaries
         result = []
@@ -53,9 +338,128 @@ class DatabaseHandler:
             result.append(dict(zip(columns, row)))
         return result
 
+    def iter_data(self, table_name: str, condition: dict = None, batch_size: int = 500, **kwargs):
+        # Stream rows as dicts, holding at most one fetchmany batch in memory.
+        # The generator may be resumed from different threads (e.g. by a
+        # streaming response), so it gets its own connection rather than a
+        # thread-local reader.
+        conn = sqlite3.connect(f'{self.db_name}.db', check_same_thread=False)
+        try:
+            conn.execute('PRAGMA query_only=ON')
+            cursor = conn.execute(*self.select(table_name, condition, **kwargs))
+            columns = [description[0] for description in cursor.description]
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(zip(columns, row))
+        finally:
+            conn.close()
+
+    def fetch_series(self, table_name: str, window: tuple, condition: dict = None, ranges: list = None):
+        # Master rows of the recurring series that can have occurrences in the
+        # window: started before it closes and not over (series_end) before it
+        # opens. Read through the partial series index, whatever the filters.
+        clauses, params = self.where(table_name, condition, ranges=ranges)
+        clauses.append("rrule IS NOT NULL")
+        start, end = window
+        if end:
+            clauses.append("start_time < ?")
+            params.append(end)
+        if start:
+            clauses.append("(series_end IS NULL OR series_end >= ?)")
+            params.append(start)
+        cmd = (f'SELECT * FROM {table_name} INDEXED BY idx_{table_name}_series '
+               f'WHERE {" AND ".join(clauses)} ORDER BY start_time')
+        columns, rows = self.query(cmd, tuple(params))
+        return [dict(zip(columns, row)) for row in rows]
+
+    def fetch_intervals(self, table_name: str, window: tuple = None):
+        # Only (start_time, end_time) tuples in start order: the query is covered
+        # by the (start_time, end_time, rrule) window index and skips building a dict per row
+        clauses, params = self.where(table_name, window=window)
+        cmd = f'SELECT start_time, end_time FROM {table_name}'
+        if clauses:
+            cmd += f' WHERE {" AND ".join(clauses)}'
+        cmd += ' ORDER BY start_time'
+        return self.query(cmd, tuple(params))[1]
+
+    def change_bounds(self, table_name: str):
+        # (oldest seq still in the log or None if it is empty, last seq ever assigned)
+        log = f'{table_name}_changes'
+        rows = self.query(f'SELECT (SELECT MIN(seq) FROM {log}), '
+                          f'(SELECT seq FROM sqlite_sequence WHERE name = ?)', (log,))[1]
+        first, last = rows[0] if rows else (None, None)
+        return first, last or 0
+
+    def last_change(self, table_name: str):
+        # Last seq assigned in the change log: one row of a tiny table, cheap enough for every request
+        rows = self.query("SELECT seq FROM sqlite_sequence WHERE name = ?", (f'{table_name}_changes',))[1]
+        return rows[0][0] if rows else 0
+
+    def changes_since(self, table_name: str, since: int, limit: int):
+        # A range scan of the seq primary key
+        cmd = f'SELECT seq, sid, op, changed_at, data FROM {table_name}_changes WHERE seq > ? ORDER BY seq LIMIT ?'
+        return self.query(cmd, (since, limit))[1]
+
+    def count_groups(self, table_name: str, groups: list, window: tuple = None):
+        # One aggregate pass; only (group values..., count) rows leave SQLite
+        clauses, params = self.where(table_name, window=window)
+        cmd = f'SELECT {", ".join(groups)}, COUNT(*) FROM {table_name}'
+        if clauses:
+            cmd += f' WHERE {" AND ".join(clauses)}'
+        cmd += f' GROUP BY {", ".join(str(i + 1) for i in range(len(groups)))}'
+        return self.query(cmd, tuple(params))[1]
+
+    def search(self, table_name: str, match: str, weights: list, limit: int, offset: int = 0):
+        fts = f'{table_name}_fts'
+        # rowid breaks ties between equally ranked rows so pages don't overlap
+        cmd = (f'SELECT {table_name}.* FROM {fts} JOIN {table_name} ON {table_name}.rowid = {fts}.rowid '
+               f'WHERE {fts} MATCH ? ORDER BY bm25({fts}, {", ".join(str(float(w)) for w in weights)}), '
+               f'{fts}.rowid LIMIT ? OFFSET ?')
+        columns, rows = self.query(cmd, (match, limit, offset))
+        return [dict(zip(columns, row)) for row in rows]
+
+    def existing_keys(self, table_name: str, key: str, values: list, chunk_size: int = 500):
+        # One indexed IN lookup per chunk instead of one query per value
+        found = set()
+        for i in range(0, len(values), chunk_size):
+            chunk = values[i:i + chunk_size]
+            cmd = f'SELECT {key} FROM {table_name} WHERE {key} IN ({", ".join("?" for _ in chunk)})'
+            found.update(row[0] for row in self.query(cmd, tuple(chunk))[1])
+        return found
+
     def check_existence(self, table_name: str, condition: dict):
-        result = self.fetch_data(table_name, condition)
-        return bool(result)
+        cond_str = ' AND '.join([f"{k} = ?" for k in condition.keys()])
+        cmd = f'SELECT 1 FROM {table_name} WHERE {cond_str} LIMIT 1'
+        return bool(self.query(cmd, tuple(condition.values()))[1])
+
+class AsyncDatabaseHandler:
+    # Async front for a DatabaseHandler: blocking sqlite3 work runs on a
+    # dedicated, bounded executor instead of the event loop or the web
+    # server's shared threadpool. Combine with pooled=True so each executor
+    # thread gets its own reader connection.
+    def __init__(self, dbh: DatabaseHandler, max_workers: int = 8):
+        self.dbh = dbh
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='db')
+
+    async def run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+
+    def __getattr__(self, name):
+        # Expose every DatabaseHandler method as an awaitable, e.g. await adbh.fetch_data(...)
+        attr = getattr(self.dbh, name)
+        if not callable(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            return await self.run(attr, *args, **kwargs)
+        return call
+
+    def close(self):
+        self.executor.shutdown(wait=True)
 
 if __name__ == '__main__':
     dbh = DatabaseHandler(db_name="CalendarDB")
@@ -1,6 +1,27 @@
 import configparser
 import json
 import datetime
+import base64
+import heapq
+import itertools
+import re
+import recurrence
+
+# Completion buckets shared with the MCP server's status filter
+STATUS_BUCKETS = {
+    'not_started': [('status', '=', 0.0)],
+    'in_progress': [('status', '>', 0.0), ('status', '<', 1.0)],
+    'completed': [('status', '=', 1.0)],
+}
+
+SORT_COLUMNS = ['start_time', 'end_time', 'creation_time']
+
+STATUS_BUCKET_SQL = ("CASE WHEN status = 0 THEN 'not_started' "
+                     "WHEN status = 1 THEN 'completed' ELSE 'in_progress' END")
+
+def status_bucket(status):
+    # Python twin of STATUS_BUCKET_SQL
+    return 'not_started' if status == 0 else 'completed' if status == 1 else 'in_progress'
 
 class Method:
     def __init__(self, conf_file):
@@ -8,6 +29,22 @@ class Method:
         self.config.read(conf_file)
         self.info = self.config['DEFAULT']
         self.columns = json.loads(self.info['columns'])
+        self.search_columns = json.loads(self.info.get('search_columns', '{}'))
+        # How far past the window start a series is expanded when the window has no end
+        self.horizon = datetime.timedelta(days=self.info.getint('recurrence_horizon_days', fallback=366))
+        # Called after every successful write through this process, e.g. to
+        # wake the change streams
+        self.listeners = []
+
+    def notify(self):
+        for listener in self.listeners:
+            listener()
+
+    def etag(self, dbh):
+        # The last seq of the change log: the triggers advance it in the same
+        # transaction as every write, whichever process or script makes it,
+        # so all workers agree on it and it never repeats for a database
+        return f'"{dbh.last_change(self.info["table_name"])}"'
 
     def check_params(self, jsn):
         # Accept priority levels 1, 2, 3 (Low, Medium, High)
@@ -20,34 +57,468 @@ class Method:
                 datetime.datetime.strptime(jsn[t], '%Y-%m-%d %H:%M:%S')
         except ValueError:
             return False
-        return True
+        return self.check_recurrence(jsn)
+
+    def check_fields(self, jsn):
+        # Same rules as check_params, for just the fields a partial update sets
+        if 'level' in jsn and jsn['level'] not in [1, 2, 3]:
+            return False
+        if 'status' in jsn and not (0 <= jsn['status'] <= 1):
+            return False
+        try:
+            for t in ['start_time', 'end_time']:
+                if t in jsn:
+                    datetime.datetime.strptime(jsn[t], '%Y-%m-%d %H:%M:%S')
+        except ValueError:
+            return False
+        return self.check_recurrence(jsn)
+
+    def check_recurrence(self, jsn):
+        # An empty rrule or exdates clears it
+        if jsn.get('rrule') and recurrence.Recurrence.parse(jsn['rrule']) is None:
+            return False
+        return recurrence.parse_exdates(jsn.get('exdates')) is not None
+
+    def series_fields(self, data):
+        # Store a series' rrule and exdates as NULL when empty, with the end of
+        # its last occurrence so window queries can skip series that are over
+        for key in ['rrule', 'exdates']:
+            if key in data and not data[key]:
+                data[key] = None
+        data['series_end'] = None
+        if data.get('rrule'):
+            data['series_end'] = recurrence.series_end(data['rrule'], data['start_time'], data['end_time'])
+        return data
+
+    def check_window(self, start, end):
+        # Accept full timestamps or bare dates; both compare correctly against
+        # the stored 'YYYY-MM-DD HH:MM:SS' strings
+        window = []
+        for t in [start, end]:
+            if t is None:
+                window.append(None)
+                continue
+            for fmt in ['%Y-%m-%d %H:%M:%S', '%Y-%m-%d']:
+                try:
+                    window.append(datetime.datetime.strptime(t, fmt).strftime('%Y-%m-%d %H:%M:%S'))
+                    break
+                except ValueError:
+                    pass
+            else:
+                return None
+        if window[0] and window[1] and window[0] >= window[1]:
+            return None
+        return tuple(window)
+
+    def check_query(self, category=None, level=None, status=None, status_min=None, status_max=None,
+                    sort=None, cursor=None, paged=False):
+        condition, ranges = {}, []
+        if category is not None:
+            condition['category'] = category
+        if level is not None:
+            condition['level'] = level
+        if status is not None:
+            if status not in STATUS_BUCKETS:
+                return None
+            ranges += STATUS_BUCKETS[status]
+        if status_min is not None:
+            ranges.append(('status', '>=', status_min))
+        if status_max is not None:
+            ranges.append(('status', '<=', status_max))
+
+        descending = bool(sort) and sort.startswith('-')
+        order = sort.lstrip('-') if sort else None
+        if order is not None and order not in SORT_COLUMNS:
+            return None
+        # Pages need a stable order to resume from
+        if order is None and (paged or cursor):
+            order = 'start_time'
+
+        after = None
+        if cursor:
+            after = self.decode_cursor(cursor)
+            if after is None:
+                return None
+        return {'condition': condition, 'ranges': ranges, 'order': order,
+                'descending': descending, 'after': after}
+
+    def encode_cursor(self, row, order):
+        token = json.dumps([row[order], row['sid']]).encode()
+        return base64.urlsafe_b64encode(token).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            value, sid = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (ValueError, TypeError):
+            return None
+        return value, sid
+
+    def page(self, rows, limit, order):
+        # Rows are fetched with limit + 1; the extra one only signals another page
+        items = rows[:limit]
+        next_cursor = self.encode_cursor(items[-1], order) if len(rows) > limit else None
+        return {'items': items, 'next_cursor': next_cursor}
+
+    def occurrence_times(self, master, window, bounds=None):
+        # Lazily yield (start, end) of each occurrence of a series that overlaps
+        # the window. A window without an end is cut at the horizon. Callers
+        # expanding many series pass the window parsed once as bounds.
+        rule = recurrence.Recurrence.parse(master['rrule'])
+        if rule is None:
+            return
+        # Stored times are validated on write, so the fast ISO parser is safe here
+        dtstart = datetime.datetime.fromisoformat(master['start_time'])
+        duration = datetime.datetime.fromisoformat(master['end_time']) - dtstart
+        start, end = bounds or self.bounds(window)
+        start = start or dtstart
+        end = end or start + self.horizon
+        for occurrence in rule.between(dtstart, duration, start, end, recurrence.split_exdates(master['exdates'])):
+            yield occurrence.isoformat(' '), (occurrence + duration).isoformat(' ')
+
+    def bounds(self, window):
+        return tuple(datetime.datetime.fromisoformat(t) if t else None for t in window)
+
+    def expand(self, master, window, bounds=None):
+        # The occurrences as rows named '<sid>@<start>'; the name is built from
+        # the ISO start, as strftime(OCCURRENCE_FORMAT) would but much faster
+        for start_time, end_time in self.occurrence_times(master, window, bounds):
+            stamp = start_time.replace('-', '').replace(':', '').replace(' ', 'T')
+            yield dict(master, sid=f"{master['sid']}@{stamp}", start_time=start_time, end_time=end_time)
+
+    def occurrences(self, dbh, window, condition=None, ranges=None, order=None, descending=False, after=None):
+        # Occurrences of every series in the window, sorted by (order, sid).
+        # Only the window's occurrences are ever built, so they are sorted in
+        # one go rather than merged series by series.
+        order = order or 'start_time'
+        key = lambda row: (row[order], row['sid'])
+        bounds = self.bounds(window)
+        rows = [row for master in dbh.fetch_series(self.info['table_name'], window, condition, ranges)
+                for row in self.expand(master, window, bounds)]
+        if after:
+            # Same keyset rule as the SQL side: resume strictly past the cursor
+            rows = [row for row in rows if (key(row) < after if descending else key(row) > after)]
+        rows.sort(key=key, reverse=descending)
+        return rows
+
+    def schedules(self, dbh, window=None, limit=None, stream=False, **query):
+        # One-off rows come from SQL. With a window, the occurrences of the
+        # recurring series are expanded and merged in; without one, each series
+        # is listed once, as its master row.
+        table_name = self.info['table_name']
+        fetch = dbh.iter_data if stream else dbh.fetch_data
+        rows = fetch(table_name, window=window, limit=limit, **query)
+        if not window:
+            return rows
+        order = query.get('order') or 'start_time'
+        rows = heapq.merge(rows, self.occurrences(dbh, window, **query), key=lambda row: (row[order], row['sid']),
+                           reverse=query.get('descending', False))
+        return rows if stream else list(itertools.islice(rows, limit))
+
+    def changes(self, dbh, since=None, limit=1000):
+        # Changes logged after seq `since`, oldest first. Without `since` there
+        # is nothing to replay, only the seq to follow from. None if the log no
+        # longer reaches back to `since`, or `since` is ahead of it (another
+        # database): the client has to reload everything and follow on from
+        # the latest seq.
+        table_name = self.info['table_name']
+        first, last = dbh.change_bounds(table_name)
+        if since is None:
+            return {'changes': [], 'last_seq': last, 'more': False}
+        if since > last or since < (last + 1 if first is None else first) - 1:
+            return None
+        rows = dbh.changes_since(table_name, since, limit + 1)
+        changes = [{'seq': seq, 'sid': sid, 'op': op, 'changed_at': changed_at,
+                    'row': json.loads(data) if data else None}
+                   for seq, sid, op, changed_at, data in rows[:limit]]
+        return {'changes': changes, 'last_seq': changes[-1]['seq'] if changes else since,
+                'more': len(rows) > limit}
+
+    def check_hours(self, day_start, day_end):
+        # Working hours as offsets from midnight; 'HH:MM', day_end may be '24:00'
+        hours = []
+        for t, default in [(day_start, '00:00'), (day_end, '24:00')]:
+            match = re.fullmatch(r'(\d{2}):(\d{2})', t or default)
+            if not match or int(match[2]) > 59:
+                return None
+            hours.append(datetime.timedelta(hours=int(match[1]), minutes=int(match[2])))
+        if not hours[0] < hours[1] <= datetime.timedelta(hours=24):
+            return None
+        return tuple(hours)
+
+    def check_search(self, q):
+        # Quote every word so user input can't inject FTS5 operators, and make
+        # each one a prefix term: "mach learn" finds "Machine Learning"
+        terms = re.findall(r'\w+', q or '')
+        if not terms:
+            return None
+        return ' '.join(f'"{t}"*' for t in terms)
+
+    def search(self, dbh, match, limit, offset=0):
+        return dbh.search(self.info['table_name'], match, list(self.search_columns.values()), limit, offset)
+
+    def stats(self, dbh, window=None):
+        groups = dbh.count_groups(self.info['table_name'], [STATUS_BUCKET_SQL, 'category', 'level'], window)
+        if window:
+            # A series counts once per occurrence in the window
+            bounds = self.bounds(window)
+            for master in dbh.fetch_series(self.info['table_name'], window):
+                count = sum(1 for _ in self.occurrence_times(master, window, bounds))
+                if count:
+                    groups.append((status_bucket(master['status']), master['category'], master['level'], count))
+        stats = {'total': 0, 'status': dict.fromkeys(STATUS_BUCKETS, 0), 'category': {}, 'level': {}}
+        for bucket, category, level, count in groups:
+            stats['total'] += count
+            stats['status'][bucket] += count
+            stats['category'][category] = stats['category'].get(category, 0) + count
+            stats['level'][str(level)] = stats['level'].get(str(level), 0) + count
+        return stats
+
+    def conflicts(self, dbh, window=None, limit=100):
+        # Sweep the events in start order, keeping the ones still running in a
+        # heap keyed by end time. Once those that ended by the next start are
+        # popped, that event overlaps exactly the ones left: O(n log n) to
+        # count every pair, plus the pairs returned.
+        table_name = self.info['table_name']
+        active, pairs, total = [], [], 0
+        for row in self.schedules(dbh, window, stream=True, order='start_time'):
+            if window and window[0] and row['end_time'] <= window[0]:
+                continue  # Only touches the window
+            while active and active[0][0] <= row['start_time']:
+                heapq.heappop(active)
+            overlapping = active
+            if row['end_time'] <= row['start_time']:
+                # A zero-length event (a deadline) only conflicts with the
+                # events running through it, not with those starting with it
+                overlapping = [a for a in active if a[2]['start_time'] < row['start_time']]
+            total += len(overlapping)
+            for end_time, _, other in overlapping:
+                if len(pairs) == limit:
+                    break
+                pairs.append({'a': other, 'b': row, 'overlap_start': row['start_time'],
+                              'overlap_end': min(end_time, row['end_time'])})
+            # sid breaks end time ties, so rows themselves are never compared
+            heapq.heappush(active, (row['end_time'], row['sid'], row))
+        return {'total': total, 'conflicts': pairs}
+
+    def free_busy(self, dbh, window, min_minutes=30, hours=None, weekdays_only=False, limit=100):
+        # Merge the busy intervals in one pass over the events in start order
+        # (clipped to the window), then return the gaps that fit in working
+        # hours and last at least min_minutes
+        start, end = window
+        busy = []
+        bounds = self.bounds(window)
+        occurrences = sorted(interval for master in dbh.fetch_series(self.info['table_name'], window)
+                             for interval in self.occurrence_times(master, window, bounds))
+        for s, e in heapq.merge(dbh.fetch_intervals(self.info['table_name'], window), occurrences, key=lambda i: i[0]):
+            s = max(s, start)
+            if e <= s:
+                continue  # Deadlines and other zero-length events don't take up time
+            if busy and s <= busy[-1][1]:
+                if e > busy[-1][1]:
+                    busy[-1][1] = e
+            else:
+                busy.append([s, e])
+        for interval in busy:
+            interval[1] = min(interval[1], end)
+
+        free = []
+        minimum = datetime.timedelta(minutes=min_minutes)
+        day_start, day_end = hours or (datetime.timedelta(0), datetime.timedelta(hours=24))
+        gap_start = datetime.datetime.fromisoformat(start)
+        for gap_end, next_start in [(b[0], b[1]) for b in busy] + [(end, end)]:
+            gap_end = datetime.datetime.fromisoformat(gap_end)
+            # A gap may span nights and weekends, so cut it into working-hour
+            # pieces; pieces meeting at midnight (e.g. 24-hour days) are joined
+            pieces = []
+            day = datetime.datetime.combine(gap_start.date(), datetime.time())
+            while day < gap_end:
+                if not weekdays_only or day.weekday() < 5:
+                    slot_start, slot_end = max(gap_start, day + day_start), min(gap_end, day + day_end)
+                    if pieces and pieces[-1][1] == slot_start:
+                        pieces[-1][1] = slot_end
+                    elif slot_start < slot_end:
+                        pieces.append([slot_start, slot_end])
+                day += datetime.timedelta(days=1)
+            free += [{'start': str(s), 'end': str(e), 'minutes': int((e - s).total_seconds() // 60)}
+                     for s, e in pieces if e - s >= minimum]
+            if len(free) >= limit:
+                break
+            gap_start = datetime.datetime.fromisoformat(next_start)
+        return {'busy': [{'start': s, 'end': e} for s, e in busy[:limit]], 'busy_total': len(busy), 'free': free[:limit]}
+
+    def conflicts_with(self, dbh, start, end, exclude=None):
+        # The window query includes events ending exactly at start; those only touch
+        rows = self.schedules(dbh, (start, end))
+        rows = [r for r in rows if r['end_time'] > start and r['sid'] != exclude]
+        return {'total': len(rows), 'conflicts': rows}
 
     def get(self, dbh, schedule_id):
-        return dbh.fetch_data(
+        rows = dbh.fetch_data(
             table_name=self.info['table_name'],
             condition={'sid': schedule_id})
+        if not rows:
+            found = self.occurrence(dbh, schedule_id)
+            rows = [found[1]] if found else []
+        return rows
+
+    def occurrence(self, dbh, schedule_id):
+        # (series master, occurrence row) for an id like 'class-cs301@20241118T090000',
+        # or None if the series has no such occurrence
+        sid, _, stamp = schedule_id.rpartition('@')
+        try:
+            start = datetime.datetime.strptime(stamp, recurrence.OCCURRENCE_FORMAT).strftime(recurrence.TIME_FORMAT)
+        except ValueError:
+            return None
+        rows = dbh.fetch_data(table_name=self.info['table_name'], condition={'sid': sid}) if sid else []
+        if not rows or not rows[0]['rrule']:
+            return None
+        for row in self.expand(rows[0], (start, None)):
+            if row['start_time'] > start:
+                break
+            if row['sid'] == schedule_id:
+                return rows[0], row
+        return None
+
+    def exclude(self, master, occurrence):
+        return ','.join(filter(None, [master['exdates'], occurrence['start_time']]))
+
+    def detach(self, dbh, schedule_id, changes):
+        # Changing one occurrence of a series stores it as a one-off row under
+        # the occurrence's id and adds it to the series' exdates, in one
+        # transaction. Returns the new row, or None if there is no such occurrence.
+        table_name = self.info['table_name']
+        with dbh.write_lock:
+            found = self.occurrence(dbh, schedule_id)
+            if found is None:
+                return None
+            master, occurrence = found
+            row = self.series_fields({**occurrence, 'rrule': None, 'exdates': None, **changes, 'sid': schedule_id})
+            ok = dbh.execute_batch([
+                dbh.insert_sql(table_name, row),
+                dbh.update_sql(table_name, {'exdates': self.exclude(master, occurrence)}, {'sid': master['sid']}),
+            ])
+        return row if self.changed(ok) else None
 
     def post(self, dbh, schedule):
-        if dbh.check_existence(self.info['table_name'], {'sid': schedule.sid}):
-            return False
         if not self.check_params(schedule.dict()):
             return False
-        dbh.insert_data(self.info['table_name'], self.columns, schedule.dict())
-        return True
+        # A single upsert-style insert; the sid primary key reports duplicates
+        data = self.series_fields(schedule.dict())
+        return self.changed(dbh.insert_data(self.info['table_name'], self.columns, data, conflict_key='sid') > 0)
 
     def update(self, dbh, schedule_id, schedule):
-        if not dbh.check_existence(self.info['table_name'], {'sid': schedule_id}):
-            return False
         if not self.check_params(schedule.dict()):
             return False
-        dbh.update_data(self.info['table_name'], schedule.dict(), {'sid': schedule_id})
-        return True
+        data = self.series_fields(schedule.dict())
+        if dbh.update_data(self.info['table_name'], data, {'sid': schedule_id}) > 0:
+            return self.changed(True)
+        data.pop('sid')
+        return self.detach(dbh, schedule_id, data) is not None
 
-    def delete(self, dbh, schedule_id):
-        if not dbh.check_existence(self.info['table_name'], {'sid': schedule_id}):
+    def patch(self, dbh, schedule_id, changes):
+        # Returns the merged row, None if there is no such schedule, False for invalid data
+        if not self.check_fields(changes):
             return False
-        dbh.delete_data(self.info['table_name'], {'sid': schedule_id})
-        return True
+        if not changes:
+            rows = self.get(dbh, schedule_id)
+            return rows[0] if rows else None
+        table_name = self.info['table_name']
+        with dbh.write_lock:
+            if changes.keys() & {'rrule', 'exdates', 'start_time', 'end_time'}:
+                # series_end depends on the merged row; holding the writer keeps it current
+                rows = dbh.fetch_data(table_name, condition={'sid': schedule_id})
+                if rows:
+                    merged = self.series_fields({**rows[0], **changes})
+                    changes = {k: merged[k] for k in [*changes, 'series_end']}
+            row = dbh.update_returning(table_name, changes, {'sid': schedule_id})
+        if row is None:
+            return self.detach(dbh, schedule_id, changes)
+        self.changed(True)
+        return row
+
+    def post_many(self, dbh, schedules):
+        table_name = self.info['table_name']
+        results, rows = [], []
+        # Hold the writer for the existence check and the insert so no other
+        # request can slip a duplicate in between
+        with dbh.write_lock:
+            existing = dbh.existing_keys(table_name, 'sid', [s.sid for s in schedules])
+            for schedule in schedules:
+                data = schedule.dict()
+                if schedule.sid in existing:
+                    results.append({'sid': schedule.sid, 'ok': False, 'error': 'Schedule already exists'})
+                elif not self.check_params(data):
+                    results.append({'sid': schedule.sid, 'ok': False, 'error': 'Invalid data'})
+                else:
+                    existing.add(schedule.sid)
+                    rows.append(self.series_fields(data))
+                    results.append({'sid': schedule.sid, 'ok': True})
+            if rows and not dbh.insert_many(table_name, rows, conflict_key='sid'):
+                self.fail_written(results)
+        return self.summarize(results)
+
+    def update_many(self, dbh, schedules):
+        table_name = self.info['table_name']
+        results, rows = [], []
+        with dbh.write_lock:
+            existing = dbh.existing_keys(table_name, 'sid', [s.sid for s in schedules])
+            for schedule in schedules:
+                data = schedule.dict()
+                if schedule.sid not in existing:
+                    results.append({'sid': schedule.sid, 'ok': False, 'error': 'Schedule not found'})
+                elif not self.check_params(data):
+                    results.append({'sid': schedule.sid, 'ok': False, 'error': 'Invalid data'})
+                else:
+                    rows.append(self.series_fields(data))
+                    results.append({'sid': schedule.sid, 'ok': True})
+            if rows and not dbh.update_many(table_name, rows, 'sid'):
+                self.fail_written(results)
+        return self.summarize(results)
+
+    def delete_many(self, dbh, schedule_ids):
+        table_name = self.info['table_name']
+        results, sids = [], []
+        with dbh.write_lock:
+            existing = dbh.existing_keys(table_name, 'sid', schedule_ids)
+            for sid in schedule_ids:
+                if sid not in existing:
+                    results.append({'sid': sid, 'ok': False, 'error': 'Schedule not found'})
+                else:
+                    existing.discard(sid)
+                    sids.append(sid)
+                    results.append({'sid': sid, 'ok': True})
+            if sids and not dbh.delete_many(table_name, 'sid', sids):
+                self.fail_written(results)
+        return self.summarize(results)
+
+    def fail_written(self, results):
+        # The batch runs in a single transaction, so a failed write rolls back every item
+        for result in results:
+            if result['ok']:
+                result.update(ok=False, error='Database write failed')
+
+    def changed(self, ok):
+        if ok:
+            self.notify()
+        return ok
+
+    def summarize(self, results):
+        succeeded = sum(1 for r in results if r['ok'])
+        self.changed(succeeded > 0)
+        return {'succeeded': succeeded, 'failed': len(results) - succeeded, 'results': results}
+
+    def delete(self, dbh, schedule_id):
+        table_name = self.info['table_name']
+        if dbh.delete_data(table_name, {'sid': schedule_id}) > 0:
+            return self.changed(True)
+        # Deleting one occurrence of a series adds it to the series' exdates
+        with dbh.write_lock:
+            found = self.occurrence(dbh, schedule_id)
+            if found is None:
+                return False
+            master, occurrence = found
+            return self.changed(dbh.update_data(table_name, {'exdates': self.exclude(master, occurrence)},
+                                                {'sid': master['sid']}) > 0)
 
 if __name__ == '__main__':
     m = Method(conf_file='db.conf')
@@ -0,0 +1,149 @@
+import datetime
+import functools
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+WEEKDAYS = ['MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU']
+# Occurrences are named '<series sid>@<start>', e.g. 'class-cs301@20241118T090000'
+OCCURRENCE_FORMAT = '%Y%m%dT%H%M%S'
+DAYS = [datetime.timedelta(days=d) for d in range(7)]
+
+class Recurrence:
+    # The RRULE subset we support: FREQ=DAILY or WEEKLY, INTERVAL, COUNT or
+    # UNTIL, and BYDAY for weekly rules, e.g. 'FREQ=WEEKLY;BYDAY=MO,WE;COUNT=30'.
+    # Occurrences repeat in periods (a day, or a week starting on Monday) of
+    # INTERVAL units, at fixed offsets from the period start, so the k-th one
+    # is computed directly instead of by stepping through the ones before it.
+    def __init__(self, freq, interval=1, count=None, until=None, byday=None):
+        self.freq = freq
+        self.interval = interval
+        self.count = count
+        self.until = until
+        self.byday = byday
+        self.period = datetime.timedelta(days=interval * (7 if freq == 'WEEKLY' else 1))
+
+    @classmethod
+    @functools.lru_cache(maxsize=1024)
+    def parse(cls, rrule):
+        # None if the rule is malformed or outside the supported subset. Rules
+        # are parsed once per distinct string: series tend to share them.
+        if not rrule:
+            return None
+        parts = {}
+        for part in rrule.upper().removeprefix('RRULE:').split(';'):
+            key, _, value = part.partition('=')
+            if not value or key in parts:
+                return None
+            parts[key] = value
+        freq = parts.pop('FREQ', None)
+        if freq not in ('DAILY', 'WEEKLY'):
+            return None
+        try:
+            interval = int(parts.pop('INTERVAL', 1))
+            count = int(parts.pop('COUNT')) if 'COUNT' in parts else None
+        except ValueError:
+            return None
+        if interval < 1 or (count is not None and count < 1):
+            return None
+        until = None
+        if 'UNTIL' in parts:
+            until = parse_until(parts.pop('UNTIL'))
+            if until is None or count is not None:
+                return None
+        byday = None
+        if 'BYDAY' in parts:
+            days = parts.pop('BYDAY').split(',')
+            if freq != 'WEEKLY' or not all(d in WEEKDAYS for d in days):
+                return None
+            byday = sorted({WEEKDAYS.index(d) for d in days})
+        return None if parts else cls(freq, interval, count, until, byday)
+
+    def offsets(self, dtstart):
+        # Occurrence offsets from the start of each period, and that start for dtstart's period
+        if self.freq == 'DAILY':
+            return DAYS[:1], dtstart, self.period
+        weekday = dtstart.weekday()
+        return [DAYS[d] for d in self.byday or [weekday]], dtstart - DAYS[weekday], self.period
+
+    def nth(self, dtstart, k):
+        # Start of the k-th occurrence (from 0), ignoring COUNT and UNTIL
+        offsets, anchor, period = self.offsets(dtstart)
+        first = [o for o in offsets if anchor + o >= dtstart]
+        if k < len(first):
+            return anchor + first[k]
+        periods, i = divmod(k - len(first), len(offsets))
+        return anchor + (periods + 1) * period + offsets[i]
+
+    def between(self, dtstart, duration, start, end, exdates=()):
+        # Lazily yield the starts of the occurrences overlapping [start, end)
+        # (touching start counts, as in window queries), skipping any whose
+        # start time or date is in exdates. Excluded occurrences still count
+        # towards COUNT.
+        offsets, anchor, period = self.offsets(dtstart)
+        first = [o for o in offsets if anchor + o >= dtstart]
+        # Jump straight to the period in which occurrences can start reaching the window
+        periods = max((start - duration - anchor) // period, 0)
+        k = 0 if periods == 0 else len(first) + (periods - 1) * len(offsets)
+        while self.count is None or k < self.count:
+            if k < len(first):
+                occurrence = anchor + first[k]
+            else:
+                p, i = divmod(k - len(first), len(offsets))
+                occurrence = anchor + (p + 1) * period + offsets[i]
+            if occurrence >= end or (self.until and occurrence > self.until):
+                return
+            if occurrence + duration >= start and not excluded(occurrence, exdates):
+                yield occurrence
+            k += 1
+
+    def last_end(self, dtstart, duration):
+        # End of the last occurrence, or None for a series without an end
+        if self.count is not None:
+            return self.nth(dtstart, self.count - 1) + duration
+        if self.until is not None:
+            # An upper bound is enough to rule the series out of later windows
+            return max(self.until, dtstart) + duration
+        return None
+
+def parse_until(value):
+    # UNTIL as in iCalendar (20241220T235959, 20241220, optional Z) or as stored
+    # timestamps and dates; a bare date includes the whole day
+    value = value.removesuffix('Z')
+    for fmt, whole_day in [(OCCURRENCE_FORMAT, False), ('%Y%m%d', True), (TIME_FORMAT, False), ('%Y-%m-%d', True)]:
+        try:
+            until = datetime.datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        return until + datetime.timedelta(days=1, seconds=-1) if whole_day else until
+    return None
+
+def split_exdates(exdates):
+    return {v.strip() for v in (exdates or '').split(',') if v.strip()}
+
+def parse_exdates(exdates):
+    # Comma-separated dates or timestamps; None if any of them is malformed
+    values = split_exdates(exdates)
+    for value in values:
+        for fmt in [TIME_FORMAT, '%Y-%m-%d']:
+            try:
+                datetime.datetime.strptime(value, fmt)
+                break
+            except ValueError:
+                pass
+        else:
+            return None
+    return values
+
+def excluded(occurrence, exdates):
+    if not exdates:
+        return False
+    stamp = occurrence.isoformat(' ')
+    return stamp in exdates or stamp[:10] in exdates
+
+def series_end(rrule, start_time, end_time):
+    # Stored with every series so window queries can skip the ones already over
+    rule = Recurrence.parse(rrule)
+    if rule is None:
+        return None
+    dtstart = datetime.datetime.fromisoformat(start_time)
+    last = rule.last_end(dtstart, datetime.datetime.fromisoformat(end_time) - dtstart)
+    return last.isoformat(' ') if last else None
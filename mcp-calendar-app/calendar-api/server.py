@@ -1,19 +1,61 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
+from typing import Optional
+import asyncio
 import configparser
+import functools
+import json
+import os
 import database_handler
 import method
 from fastapi.middleware.cors import CORSMiddleware
 
+try:
+    import orjson
+
+    def dumps(obj):
+        return orjson.dumps(obj)
+except ImportError:
+    def dumps(obj):
+        return json.dumps(obj, separators=(',', ':')).encode()
+
 app = FastAPI()
 
 config = configparser.ConfigParser()
 config.read('db.conf')
 info = config['DEFAULT']
 
-dbh = database_handler.DatabaseHandler(db_name=info['db_name'], check_same_thread=False)
+dbh = database_handler.DatabaseHandler(db_name=info['db_name'], check_same_thread=False,
+                                       pooled=info.getboolean('pooled', fallback=False))
 m = method.Method(conf_file='db.conf')
 
+# In async mode every endpoint is an `async def` whose database work runs on a
+# dedicated DB executor, so waiting on sqlite3 doesn't hold a threadpool slot.
+# CALENDAR_API_ASYNC overrides db.conf, e.g. to benchmark both modes.
+async_mode = os.getenv('CALENDAR_API_ASYNC', info.get('async_mode', 'false')).lower() in ('1', 'true', 'yes', 'on')
+adbh = database_handler.AsyncDatabaseHandler(dbh, max_workers=info.getint('db_workers', fallback=8))
+
+def db_endpoint(fn):
+    if not async_mode:
+        return fn
+
+    @functools.wraps(fn)
+    async def endpoint(*args, **kwargs):
+        return await adbh.run(fn, *args, **kwargs)
+    return endpoint
+
+# Bring databases created by older versions up to the current schema, then
+# make sure the indexes exist on them
+migrated = dbh.migrate_schema(info['table_name'], m.columns, info.getint('schema_version', fallback=1))
+for index_name, index_columns in json.loads(info.get('indexes', '{}')).items():
+    dbh.create_index(info['table_name'], index_name, index_columns)
+dbh.create_window_index(info['table_name'])
+dbh.create_series_index(info['table_name'])
+if m.search_columns:
+    dbh.create_search_index(info['table_name'], list(m.search_columns), rebuild=migrated)
+dbh.create_change_log(info['table_name'], list(m.columns), info.getint('change_log_size', fallback=100000))
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -23,6 +65,79 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
+def json_response(data, etag=None):
+    # Rows are plain dicts of str/int/float, so skip FastAPI's generic encoder walk
+    return Response(content=dumps(data), media_type='application/json', headers=cache_headers(etag))
+
+def cache_headers(etag):
+    # no-cache lets clients keep the body but makes them revalidate it every time
+    if etag is None:
+        return None
+    return {'ETag': etag, 'Cache-Control': 'no-cache'}
+
+def not_modified(if_none_match, etag):
+    # Answered from the change version alone, without touching the table
+    if if_none_match is None:
+        return None
+    tags = [t.strip().removeprefix('W/') for t in if_none_match.split(',')]
+    if '*' in tags or etag in tags:
+        return Response(status_code=304, headers=cache_headers(etag))
+    return None
+
+def stream_rows(rows, fmt, chunk_rows=500, etag=None):
+    # Each chunk is one hop through the threadpool, so send rows in batches
+    # rather than one by one
+    separator, opening, closing = (b'\n', b'', b'\n') if fmt == 'ndjson' else (b',', b'[', b']')
+
+    def chunks():
+        yield opening
+        batch = []
+        first = True
+        for row in rows:
+            batch.append(dumps(row))
+            if len(batch) == chunk_rows:
+                yield (b'' if first else separator) + separator.join(batch)
+                batch, first = [], False
+        if batch:
+            yield (b'' if first else separator) + separator.join(batch)
+        elif first and fmt == 'ndjson':
+            return
+        yield closing
+    media_type = 'application/x-ndjson' if fmt == 'ndjson' else 'application/json'
+    return StreamingResponse(chunks(), media_type=media_type, headers=cache_headers(etag))
+
+class ChangeFeed:
+    # Wakes the open change streams after a write through this process. Writes
+    # by other worker processes aren't announced here, so streams also poll.
+    def __init__(self, poll_seconds=1.0, heartbeat_seconds=15.0):
+        self.poll_seconds = poll_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.waiters = set()
+        self.loop = None
+
+    def notify(self):
+        # Called from whichever thread did the write
+        if self.loop is not None and self.waiters:
+            self.loop.call_soon_threadsafe(self.wake)
+
+    def wake(self):
+        for event in self.waiters:
+            event.set()
+
+    async def wait(self, event):
+        try:
+            await asyncio.wait_for(event.wait(), self.poll_seconds)
+        except asyncio.TimeoutError:
+            pass
+        event.clear()
+
+feed = ChangeFeed()
+m.listeners.append(feed.notify)
+
+def sse_frame(event, data, event_id=None):
+    frame = b'' if event_id is None else f'id: {event_id}\n'.encode()
+    return frame + f'event: {event}\ndata: '.encode() + dumps(data) + b'\n\n'
+
 class Schedule(BaseModel):
     sid: str
     name: str
@@ -33,35 +148,214 @@ class Schedule(BaseModel):
     creation_time: str
     start_time: str
     end_time: str
+    # Recurring series: an RRULE such as 'FREQ=WEEKLY;BYDAY=MO,WE;COUNT=30' and
+    # comma-separated dates or timestamps of cancelled occurrences
+    rrule: Optional[str] = None
+    exdates: Optional[str] = None
+
+class SchedulePatch(BaseModel):
+    # Only the fields present in the request body are written
+    name: str = None
+    content: str = None
+    category: str = None
+    level: int = None
+    status: float = None
+    start_time: str = None
+    end_time: str = None
+    rrule: str = None
+    exdates: str = None
+
+class ScheduleIds(BaseModel):
+    sids: list[str]
 
 @app.get('/')
 def index():
     return {'app_name': 'calendar'}
 
 @app.get('/schedules')
-def get_schedules():
-    return dbh.fetch_data(info['table_name'])
+@db_endpoint
+def get_schedules(start: str = Query(None, alias='from'), end: str = Query(None, alias='to'),
+                  category: str = None, level: int = None, status: str = None,
+                  status_min: float = None, status_max: float = None, sort: str = None,
+                  limit: int = Query(None, ge=1, le=1000), cursor: str = None,
+                  stream: str = Query(None, pattern='^(ndjson|json)$'),
+                  if_none_match: str = Header(None)):
+    window = None
+    if start is not None or end is not None:
+        window = m.check_window(start, end)
+        if window is None:
+            raise HTTPException(status_code=400, detail="Invalid time window")
+    query = m.check_query(category=category, level=level, status=status, status_min=status_min,
+                          status_max=status_max, sort=sort, cursor=cursor, paged=limit is not None)
+    if query is None:
+        raise HTTPException(status_code=400, detail="Invalid filter, sort or cursor")
+    if stream and limit is not None:
+        raise HTTPException(status_code=400, detail="Streaming cannot be combined with limit")
+    # Read the version before the rows, so a concurrent write can only make the tag stale
+    etag = m.etag(dbh)
+    cached = not_modified(if_none_match, etag)
+    if cached:
+        return cached
+    if stream:
+        return stream_rows(m.schedules(dbh, window, stream=True, **query), stream, etag=etag)
+    if limit is None:
+        return json_response(m.schedules(dbh, window, **query), etag)
+    rows = m.schedules(dbh, window, limit=limit + 1, **query)
+    return json_response(m.page(rows, limit, query['order']), etag)
+
+@app.get('/schedules/search')
+@db_endpoint
+def search_schedules(q: str, limit: int = Query(20, ge=1, le=1000), offset: int = Query(0, ge=0)):
+    match = m.check_search(q)
+    if match is None:
+        raise HTTPException(status_code=400, detail="Search query must contain at least one word")
+    return json_response(m.search(dbh, match, limit, offset))
+
+@app.get('/schedules/stats')
+@db_endpoint
+def get_schedule_stats(start: str = Query(None, alias='from'), end: str = Query(None, alias='to')):
+    window = None
+    if start is not None or end is not None:
+        window = m.check_window(start, end)
+        if window is None:
+            raise HTTPException(status_code=400, detail="Invalid time window")
+    return m.stats(dbh, window)
+
+@app.get('/schedules/conflicts')
+@db_endpoint
+def get_schedule_conflicts(start: str = Query(None, alias='from'), end: str = Query(None, alias='to'),
+                           start_time: str = None, end_time: str = None, exclude: str = None,
+                           limit: int = Query(100, ge=1, le=1000)):
+    # With start_time/end_time, check one candidate slot; otherwise report
+    # every overlapping pair in the window
+    if start_time is not None or end_time is not None:
+        candidate = m.check_window(start_time, end_time)
+        if candidate is None or None in candidate:
+            raise HTTPException(status_code=400, detail="start_time and end_time are both required, start_time first")
+        return json_response(m.conflicts_with(dbh, *candidate, exclude=exclude))
+    window = None
+    if start is not None or end is not None:
+        window = m.check_window(start, end)
+        if window is None:
+            raise HTTPException(status_code=400, detail="Invalid time window")
+    return json_response(m.conflicts(dbh, window, limit))
+
+@app.get('/schedules/free')
+@db_endpoint
+def get_free_slots(start: str = Query(..., alias='from'), end: str = Query(..., alias='to'),
+                   min_minutes: int = Query(30, ge=1, le=1440), day_start: str = None, day_end: str = None,
+                   weekdays_only: bool = False, limit: int = Query(100, ge=1, le=1000)):
+    window = m.check_window(start, end)
+    if window is None:
+        raise HTTPException(status_code=400, detail="Invalid time window")
+    hours = m.check_hours(day_start, day_end)
+    if hours is None:
+        raise HTTPException(status_code=400, detail="Working hours must be HH:MM with day_start before day_end")
+    return json_response(m.free_busy(dbh, window, min_minutes, hours, weekdays_only, limit))
+
+@app.get('/schedules/changes')
+@db_endpoint
+def get_schedule_changes(since: int = Query(None, ge=0), limit: int = Query(1000, ge=1, le=10000)):
+    changes = m.changes(dbh, since, limit)
+    if changes is None:
+        raise HTTPException(status_code=410, detail="Changes since this seq are no longer available, reload all schedules")
+    return json_response(changes)
+
+@app.get('/schedules/changes/stream')
+async def stream_schedule_changes(since: int = Query(None, ge=0), last_event_id: str = Header(None)):
+    # Server-sent events: one 'change' event per logged change, with the seq
+    # as event id so a reconnecting EventSource resumes where it stopped
+    if last_event_id is not None and last_event_id.isdigit():
+        since = int(last_event_id)
+    changes = await adbh.run(m.changes, dbh, since)
+    if changes is None:
+        raise HTTPException(status_code=410, detail="Changes since this seq are no longer available, reload all schedules")
+    feed.loop = asyncio.get_running_loop()
+    start = changes['last_seq'] if since is None else since
+
+    async def events(changes):
+        event = asyncio.Event()
+        feed.waiters.add(event)
+        try:
+            # Tells the client where it is following from
+            yield sse_frame('ready', {'since': start})
+            idle = 0.0
+            while True:
+                for change in changes['changes']:
+                    yield sse_frame('change', change, change['seq'])
+                if changes['changes']:
+                    idle = 0.0
+                if not changes['more']:
+                    await feed.wait(event)
+                    idle += feed.poll_seconds
+                    if idle >= feed.heartbeat_seconds:
+                        # Keeps proxies from closing a quiet connection
+                        yield b': keepalive\n\n'
+                        idle = 0.0
+                since = changes['last_seq']
+                changes = await adbh.run(m.changes, dbh, since)
+                if changes is None:
+                    # Fell behind the retained log
+                    yield sse_frame('reset', {'since': since})
+                    return
+        finally:
+            feed.waiters.discard(event)
+    return StreamingResponse(events(changes), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.post('/schedules/bulk')
+@db_endpoint
+def create_schedules(schedules: list[Schedule]):
+    return m.post_many(dbh, schedules)
+
+@app.put('/schedules/bulk')
+@db_endpoint
+def update_schedules(schedules: list[Schedule]):
+    return m.update_many(dbh, schedules)
+
+@app.post('/schedules/bulk/delete')
+@db_endpoint
+def delete_schedules(ids: ScheduleIds):
+    return m.delete_many(dbh, ids.sids)
 
 @app.get('/schedules/{schedule_id}')
-def get_schedule(schedule_id: str):
+@db_endpoint
+def get_schedule(schedule_id: str, if_none_match: str = Header(None)):
+    etag = m.etag(dbh)
+    cached = not_modified(if_none_match, etag)
+    if cached:
+        return cached
     schedule = m.get(dbh, schedule_id)
     if not schedule:
         raise HTTPException(status_code=404, detail="Schedule not found")
-    return schedule
+    return json_response(schedule, etag)
 
 @app.post('/schedules')
+@db_endpoint
 def create_schedule(schedule: Schedule):
     if not m.post(dbh, schedule):
         raise HTTPException(status_code=400, detail="Schedule already exists or invalid data")
     return schedule
 
 @app.put('/schedules/{schedule_id}')
+@db_endpoint
 def update_schedule(schedule_id: str, schedule: Schedule):
     if not m.update(dbh, schedule_id, schedule):
         raise HTTPException(status_code=404, detail="Schedule not found or invalid data")
     return schedule
 
+@app.patch('/schedules/{schedule_id}')
+@db_endpoint
+def patch_schedule(schedule_id: str, changes: SchedulePatch):
+    row = m.patch(dbh, schedule_id, changes.dict(exclude_none=True))
+    if row is False:
+        raise HTTPException(status_code=400, detail="Invalid data")
+    if row is None:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    return json_response(row)
+
 @app.delete('/schedules/{schedule_id}')
+@db_endpoint
 def delete_schedule(schedule_id: str):
     if not m.delete(dbh, schedule_id):
         raise HTTPException(status_code=404, detail="Schedule not found")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for the Calendar API, run in-process with FastAPI's TestClient against a
+temporary database (python test_api.py)
+"""
+import contextlib
+import io
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+# server.py reads db.conf and opens CalendarDB.db in the working directory
+WORKDIR = tempfile.mkdtemp()
+shutil.copy(os.path.join(HERE, 'db.conf'), WORKDIR)
+os.chdir(WORKDIR)
+
+from fastapi.testclient import TestClient
+import server
+from database_handler import DatabaseHandler
+
+client = TestClient(server.app)
+RETURNING = sqlite3.sqlite_version_info
+
+SERIES = {
+    "sid": "test-series", "name": "Test Seminar", "content": "", "category": "Seminar", "level": 2,
+    "status": 0.0, "creation_time": "2025-01-01 00:00:00", "start_time": "2025-03-03 10:00:00",
+    "end_time": "2025-03-03 11:00:00", "rrule": "FREQ=WEEKLY;COUNT=4"
+}
+
+def check_patch(version):
+    """PATCH of an unknown id is a 404 and PATCH of an occurrence detaches it, on either UPDATE path"""
+    sqlite3.sqlite_version_info = version
+    try:
+        client.delete(f"/schedules/{SERIES['sid']}")
+        created = client.post("/schedules", json=SERIES)
+        missing = client.patch("/schedules/nope", json={"status": 0.5})
+        occurrence = client.patch(f"/schedules/{SERIES['sid']}@20250310T100000", json={"status": 0.5})
+        series = client.patch(f"/schedules/{SERIES['sid']}", json={"name": "Renamed Seminar"})
+    finally:
+        sqlite3.sqlite_version_info = RETURNING
+    idle = not server.dbh.conn.in_transaction
+    ok = (created.status_code == 200 and missing.status_code == 404 and occurrence.status_code == 200
+          and occurrence.json()["sid"] == f"{SERIES['sid']}@20250310T100000"
+          and series.status_code == 200 and series.json()["name"] == "Renamed Seminar" and idle)
+    print(f"{'✅' if ok else '❌'} SQLite {'.'.join(map(str, version))}: unknown id {missing.status_code}, "
+          f"occurrence {occurrence.status_code}, series {series.status_code}, writer idle: {idle}")
+    return ok
+
+def test_patch_returning():
+    print("\n✏️ Testing PATCH with UPDATE ... RETURNING...")
+    if RETURNING < (3, 35):
+        print("⏭️ This SQLite has no RETURNING; covered by the fallback test")
+        return True
+    return check_patch(RETURNING)
+
+def test_patch_fallback():
+    print("\n✏️ Testing PATCH on SQLite before 3.35 (UPDATE, then SELECT)...")
+    return check_patch((3, 34, 1))
+
+def test_migrate_duplicates():
+    print("\n🗄️ Testing schema migration of a table with duplicate sids...")
+    dbh = DatabaseHandler(os.path.join(WORKDIR, "migrate.db"))
+    dbh.execute("CREATE TABLE schedules (sid TEXT, name TEXT)")
+    for sid, name in [("a", "first a"), ("b", "b"), ("a", "second a"), ("c", "c"), ("a", "third a"), ("b", "second b")]:
+        dbh.execute("INSERT INTO schedules (sid, name) VALUES (?, ?)", (sid, name))
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        migrated = dbh.migrate_schema("schedules", {"sid": "TEXT PRIMARY KEY", "name": "TEXT"}, 2)
+    rows = dict(dbh.query("SELECT sid, name FROM schedules")[1])
+    message = out.getvalue()
+    ok = (migrated and rows == {"a": "first a", "b": "b", "c": "c"} and "dropped 3 of 6 rows" in message
+          and "a (2 dropped)" in message and "b (1 dropped)" in message and dbh.schema_version() == 2)
+    print(f"{'✅' if ok else '❌'} {len(rows)} rows kept; reported: {message.strip()}")
+    return ok
+
+def main():
+    print("🎓 Calendar API Test Suite")
+    print("=" * 60)
+    tests = [test_patch_returning, test_patch_fallback, test_migrate_duplicates]
+    passed = 0
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except Exception as e:
+            print(f"❌ Test {test.__name__} failed with exception: {e}")
+    shutil.rmtree(WORKDIR, ignore_errors=True)
+
+    print("\n" + "=" * 60)
+    print(f"📈 Test Results: {passed}/{len(tests)} tests passed")
+    if passed == len(tests):
+        print("🎉 All tests passed!")
+        return 0
+    print("⚠️  Some tests failed.")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
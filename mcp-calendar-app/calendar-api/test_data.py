@@ -3,10 +3,10 @@
 Test data script to populate the calendar database with sample schedules
 """
 
-import json
 from datetime import datetime, timedelta
 import database_handler
 import configparser
+import recurrence
 
 def load_config():
     config = configparser.ConfigParser()
@@ -32,7 +32,9 @@ def create_test_schedules():
             "status": 0.0,
             "creation_time": today.strftime("%Y-%m-%d %H:%M:%S"),
             "start_time": f"{current_year}-{current_month:02d}-{today.day:02d} 09:00:00",
-            "end_time": f"{current_year}-{current_month:02d}-{today.day:02d} 10:30:00"
+            "end_time": f"{current_year}-{current_month:02d}-{today.day:02d} 10:30:00",
+            # Every week of the 15-week semester, stored as this one row
+            "rrule": "FREQ=WEEKLY;COUNT=15"
         },
         {
             "sid": "office-hours-001",
@@ -185,22 +187,30 @@ def populate_database():
     # Initialize database handler
     dbh = database_handler.DatabaseHandler(db_name=info['db_name'], check_same_thread=False)
     
-    # Create test schedules
+    # Create test schedules; every row needs the same columns for the batch insert
     test_schedules = create_test_schedules()
+    for schedule in test_schedules:
+        schedule.setdefault('rrule', None)
+        schedule.setdefault('exdates', None)
+        schedule['series_end'] = recurrence.series_end(schedule['rrule'], schedule['start_time'], schedule['end_time'])
     
-    # Insert test data
-    success_count = 0
+    # Insert test data in one batch, skipping schedules that already exist
+    existing = dbh.existing_keys(info['table_name'], 'sid', [schedule['sid'] for schedule in test_schedules])
+    new_schedules = []
     for schedule in test_schedules:
-        try:
-            # Check if schedule already exists
-            if not dbh.check_existence(info['table_name'], {'sid': schedule['sid']}):
-                dbh.insert_data(info['table_name'], json.loads(info['columns']), schedule)
+        if schedule['sid'] in existing:
+            print(f"⚠️  Skipped: {schedule['name']} (already exists)")
+        else:
+            new_schedules.append(schedule)
+    
+    success_count = 0
+    if new_schedules:
+        if dbh.insert_many(info['table_name'], new_schedules):
+            for schedule in new_schedules:
                 print(f"✅ Added: {schedule['name']} ({schedule['category']})")
-                success_count += 1
-            else:
-                print(f"⚠️  Skipped: {schedule['name']} (already exists)")
-        except Exception as e:
-            print(f"❌ Error adding {schedule['name']}: {e}")
+            success_count = len(new_schedules)
+        else:
+            print(f"❌ Error adding {len(new_schedules)} schedules")
     
     print(f"\n🎉 Successfully added {success_count} test schedules!")
     print("📅 You can now view them in the frontend calendar.")
@@ -219,16 +229,18 @@ def clear_test_data():
     test_schedules = create_test_schedules()
     test_ids = [schedule['sid'] for schedule in test_schedules]
     
-    # Remove test data
+    # Remove test data in one batch
+    existing = dbh.existing_keys(info['table_name'], 'sid', test_ids)
+    removed_ids = [sid for sid in test_ids if sid in existing]
+    
     removed_count = 0
-    for sid in test_ids:
-        try:
-            if dbh.check_existence(info['table_name'], {'sid': sid}):
-                dbh.delete_data(info['table_name'], {'sid': sid})
+    if removed_ids:
+        if dbh.delete_many(info['table_name'], 'sid', removed_ids):
+            for sid in removed_ids:
                 print(f"🗑️  Removed: {sid}")
-                removed_count += 1
-        except Exception as e:
-            print(f"❌ Error removing {sid}: {e}")
+            removed_count = len(removed_ids)
+        else:
+            print(f"❌ Error removing {len(removed_ids)} schedules")
     
     print(f"\n✅ Removed {removed_count} test schedules!")
 
@@ -1,5 +1,5 @@
 // src/components/Calendar.js
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import axios from 'axios';
 import Day from './Day';
 import EventModal from './EventModal';
@@ -23,14 +23,73 @@ const Calendar = () => {
     end_time: ""
   });
 
+  // Bumped to reopen the change stream after it fell too far behind
+  const [feedGeneration, setFeedGeneration] = useState(0);
+  // Latest schedules for the change stream's listener
+  const schedulesRef = useRef(schedules);
+  schedulesRef.current = schedules;
+
   // Fetch schedules when the component mounts or the month changes
   useEffect(() => {
     fetchSchedules();
   }, [currentMonth]);
 
-  // Function to fetch schedules from the backend
+  // Follow the backend's change stream so edits made anywhere (other tabs,
+  // the MCP server) show up without reloading the month
+  useEffect(() => {
+    const { monthStart, monthEnd } = monthWindow();
+    const source = new EventSource('http://127.0.0.1:8000/schedules/changes/stream');
+
+    source.addEventListener('change', (e) => {
+      const change = JSON.parse(e.data);
+      // Repeating events are expanded by the backend, so refetch the month
+      // instead of working out their occurrences here
+      if ((change.row && change.row.rrule) || schedulesRef.current.some((s) => s.sid.startsWith(`${change.sid}@`))) {
+        fetchSchedules();
+        return;
+      }
+      setSchedules((prev) => {
+        const others = prev.filter((s) => s.sid !== change.sid);
+        const row = change.row;
+        if (change.op === 'upsert' && row.start_time < monthEnd && row.end_time >= monthStart) {
+          return [...others, row].sort((a, b) => a.start_time.localeCompare(b.start_time));
+        }
+        return others;
+      });
+    });
+
+    // Missed more changes than the backend keeps: reload and start over
+    const restart = () => {
+      source.close();
+      fetchSchedules();
+      setFeedGeneration((g) => g + 1);
+    };
+    source.addEventListener('reset', restart);
+    // EventSource retries dropped connections by itself, resuming after the
+    // last seq it saw, but gives up if the backend answers that with a 410
+    source.onerror = () => {
+      if (source.readyState === EventSource.CLOSED) {
+        restart();
+      }
+    };
+
+    return () => source.close();
+  }, [currentMonth, feedGeneration]);
+
+  // The displayed month as a [from, to) window of dates
+  const monthWindow = () => {
+    const year = new Date().getFullYear();
+    const monthStart = `${year}-${String(currentMonth + 1).padStart(2, '0')}-01`;
+    const nextMonth = new Date(year, currentMonth + 1, 1);
+    const monthEnd = `${nextMonth.getFullYear()}-${String(nextMonth.getMonth() + 1).padStart(2, '0')}-01`;
+    return { monthStart, monthEnd };
+  };
+
+  // Function to fetch the displayed month's schedules from the backend
   const fetchSchedules = () => {
-    axios.get('http://127.0.0.1:8000/schedules')
+    const { monthStart, monthEnd } = monthWindow();
+
+    axios.get('http://127.0.0.1:8000/schedules', { params: { from: monthStart, to: monthEnd } })
       .then((response) => {
         setSchedules(response.data);
       })
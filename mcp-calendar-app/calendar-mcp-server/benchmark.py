@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Per-tool latency benchmark for the Calendar MCP Server, with and without the pooled API session
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import threading
+import time
+from datetime import datetime, timedelta
+
+from aiohttp import web
+
+import server
+
+def make_events(count):
+    now = datetime.now()
+    events = []
+    for i in range(count):
+        start = now + timedelta(hours=i)
+        events.append({
+            "sid": f"bench-{i}",
+            "name": f"Benchmark Lecture {i}",
+            "content": "Stand-in event",
+            "category": "Lecture",
+            "level": 2,
+            "status": 0.0,
+            "creation_time": now.strftime("%Y-%m-%d %H:%M:%S"),
+            "start_time": start.strftime("%Y-%m-%d %H:%M:%S"),
+            "end_time": (start + timedelta(hours=1)).strftime("%Y-%m-%d %H:%M:%S"),
+        })
+    return events
+
+def stand_in_app(events):
+    """A canned Calendar API answering every endpoint the tools use"""
+    by_sid = {e["sid"]: e for e in events}
+    stats = {"total": len(events), "status": {"not_started": len(events), "in_progress": 0, "completed": 0},
+             "category": {"Lecture": len(events)}, "level": {"2": len(events)}}
+
+    async def index(request):
+        return web.json_response({"app_name": "calendar"})
+
+    async def list_schedules(request):
+        if request.query.get("stream") == "ndjson":
+            body = "".join(json.dumps(e) + "\n" for e in events)
+            return web.Response(text=body, content_type="application/x-ndjson")
+        if "limit" in request.query:
+            return web.json_response({"items": events[:int(request.query["limit"])], "next_cursor": None})
+        return web.json_response(events)
+
+    async def search(request):
+        return web.json_response(events[:int(request.query.get("limit", 20))])
+
+    async def get_stats(request):
+        return web.json_response(stats)
+
+    async def get_schedule(request):
+        event = by_sid.get(request.match_info["sid"])
+        return web.json_response([event] if event else [])
+
+    async def write_schedule(request):
+        return web.json_response(await request.json())
+
+    async def patch_schedule(request):
+        return web.json_response({**by_sid[request.match_info["sid"]], **await request.json()})
+
+    app = web.Application()
+    app.router.add_get("/", index)
+    app.router.add_get("/schedules", list_schedules)
+    app.router.add_get("/schedules/search", search)
+    app.router.add_get("/schedules/stats", get_stats)
+    app.router.add_get("/schedules/{sid}", get_schedule)
+    app.router.add_put("/schedules/{sid}", write_schedule)
+    app.router.add_patch("/schedules/{sid}", patch_schedule)
+    app.router.add_post("/schedules", write_schedule)
+    return app
+
+def start_stand_in(port, events):
+    """Serve the stand-in API from its own thread and event loop"""
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+
+    async def run():
+        runner = web.AppRunner(stand_in_app(events), access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", port).start()
+        ready.set()
+
+    def target():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(run())
+        loop.run_forever()
+
+    threading.Thread(target=target, daemon=True).start()
+    ready.wait()
+
+TOOL_CALLS = [
+    ("get_all_events", {}),
+    ("get_event", {"event_id": "bench-0"}),
+    ("update_event", {"event_id": "bench-0", "status": 0.5}),
+    ("get_upcoming_events", {"days": 7}),
+    ("get_events_by_date", {"date": datetime.now().strftime("%Y-%m-%d")}),
+    ("search_events", {"query": "lecture"}),
+    ("get_calendar_statistics", {"period": "month"}),
+]
+
+async def time_tools(iterations):
+    results = {}
+    for name, arguments in TOOL_CALLS:
+        latencies = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            await server.handle_call_tool(name, arguments)
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        results[name] = (statistics.mean(latencies), statistics.median(latencies),
+                         latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))])
+    return results
+
+async def run(iterations):
+    # Without an open session every request makes (and tears down) its own
+    unpooled = await time_tools(iterations)
+    await server.open_http_session()
+    try:
+        pooled = await time_tools(iterations)
+    finally:
+        await server.close_http_session()
+    return unpooled, pooled
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8766, help="Port for the stand-in Calendar API")
+    parser.add_argument("--iterations", type=int, default=200, help="Calls per tool and mode")
+    parser.add_argument("--events", type=int, default=50, help="Events served by the stand-in API")
+    args = parser.parse_args()
+
+    logging.getLogger("calendar-mcp-server").setLevel(logging.WARNING)
+    start_stand_in(args.port, make_events(args.events))
+    server.CALENDAR_API_BASE_URL = f"http://127.0.0.1:{args.port}"
+    # Measure the transport, not the response cache
+    server.schedule_cache.ttl = 0
+
+    unpooled, pooled = asyncio.run(run(args.iterations))
+    print(f"\n📈 Tool latency over {args.iterations} calls (ms, per-call session → pooled session)")
+    print(f"{'tool':<24} {'mean':>17} {'p50':>17} {'p99':>17}")
+    for name, _ in TOOL_CALLS:
+        cells = [f"{a:7.2f} → {b:7.2f}" for a, b in zip(unpooled[name], pooled[name])]
+        print(f"{name:<24} {cells[0]:>17} {cells[1]:>17} {cells[2]:>17}")
+
+if __name__ == "__main__":
+    main()
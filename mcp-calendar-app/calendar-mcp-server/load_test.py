@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Load test for the Calendar MCP Server's HTTP transport: many concurrent agent sessions against one server process
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import aiohttp
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+from mcp.client.streamable_http import streamablehttp_client
+
+from benchmark import make_events, start_stand_in
+
+SESSION_CALLS = [
+    ("get_all_events", {}),
+    ("get_upcoming_events", {"days": 7}),
+    ("search_events", {"query": "lecture"}),
+    ("get_calendar_statistics", {"period": "month"}),
+]
+
+def cpu_seconds(pid):
+    """User + system CPU time of a process, from /proc (Linux only)"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except OSError:
+        return None
+
+def serve(transport, port, api_url):
+    env = dict(os.environ, MCP_TRANSPORT=transport, MCP_PORT=str(port), CALENDAR_API_BASE_URL=api_url)
+    process = subprocess.Popen([sys.executable, "server.py"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                               env=env, stderr=subprocess.DEVNULL)
+    return process
+
+async def wait_ready(port):
+    deadline = time.monotonic() + 30
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            try:
+                async with session.get(f"http://127.0.0.1:{port}/health") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"MCP server did not start on port {port}")
+
+def connect(transport, port):
+    if transport == "sse":
+        return sse_client(f"http://127.0.0.1:{port}/sse")
+    return streamablehttp_client(f"http://127.0.0.1:{port}/mcp")
+
+async def run_session(transport, port, calls, latencies):
+    """One agent: connect, initialize, make `calls` tool calls, disconnect"""
+    async with connect(transport, port) as streams:
+        async with ClientSession(streams[0], streams[1]) as session:
+            await session.initialize()
+            for i in range(calls):
+                name, arguments = SESSION_CALLS[i % len(SESSION_CALLS)]
+                start = time.perf_counter()
+                await session.call_tool(name, arguments)
+                latencies.append((time.perf_counter() - start) * 1000)
+
+async def run_load(transport, port, sessions, concurrency, calls):
+    latencies, errors = [], 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def agent():
+        nonlocal errors
+        async with semaphore:
+            try:
+                await run_session(transport, port, calls, latencies)
+            except Exception:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(agent() for _ in range(sessions)))
+    return time.perf_counter() - started, latencies, errors
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transport", default="streamable-http", choices=["streamable-http", "sse"])
+    parser.add_argument("--sessions", type=int, default=200, help="Agent sessions to run in total")
+    parser.add_argument("--concurrency", default="1,10,50", help="Comma-separated concurrent session counts")
+    parser.add_argument("--calls", type=int, default=5, help="Tool calls per session")
+    parser.add_argument("--port", type=int, default=8767, help="Port for the MCP server")
+    parser.add_argument("--api-port", type=int, default=8766, help="Port for the stand-in Calendar API")
+    args = parser.parse_args()
+
+    # Keep the client libraries' per-request logging out of the report
+    logging.getLogger().setLevel(logging.WARNING)
+    start_stand_in(args.api_port, make_events(50))
+    process = serve(args.transport, args.port, f"http://127.0.0.1:{args.api_port}")
+    try:
+        await wait_ready(args.port)
+        print(f"\n📈 {args.sessions} sessions x {args.calls} tool calls over {args.transport}, one server process")
+        print(f"{'concurrent':>10} {'errors':>7} {'sessions/s':>11} {'server cpu s':>13} {'sessions/cpu-s':>15} {'call p50 ms':>12} {'call p99 ms':>12}")
+        for concurrency in [int(c) for c in args.concurrency.split(",")]:
+            cpu_before = cpu_seconds(process.pid)
+            elapsed, latencies, errors = await run_load(args.transport, args.port, args.sessions, concurrency, args.calls)
+            cpu_after = cpu_seconds(process.pid)
+            cpu = cpu_after - cpu_before if cpu_before is not None and cpu_after is not None else None
+            latencies.sort()
+            p50 = statistics.median(latencies) if latencies else 0.0
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else 0.0
+            per_cpu = f"{(args.sessions - errors) / cpu:>15.1f}" if cpu else f"{'n/a':>15}"
+            cpu_text = f"{cpu:>13.2f}" if cpu is not None else f"{'n/a':>13}"
+            print(f"{concurrency:>10} {errors:>7} {args.sessions / elapsed:>11.1f} {cpu_text} {per_cpu} {p50:>12.2f} {p99:>12.2f}")
+    finally:
+        process.terminate()
+        process.wait()
+
+if __name__ == "__main__":
+    asyncio.run(main())
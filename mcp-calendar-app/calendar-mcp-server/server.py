@@ -4,11 +4,20 @@ Redwood Digital University Calendar MCP Server - Provides access to academic cal
 """
 
 import asyncio
+import base64
+import bisect
+import contextlib
+import contextvars
 import json
 import logging
 import os
+import random
+import signal
+import time
+from collections import OrderedDict
 from typing import Any, Sequence
 import aiohttp
+import jsonschema
 from datetime import datetime, timedelta
 
 from mcp.server import Server, NotificationOptions
@@ -31,301 +40,1082 @@ server = Server("calendar-mcp-server")
 # Calendar API configuration
 CALENDAR_API_BASE_URL = os.getenv("CALENDAR_API_BASE_URL", "http://127.0.0.1:8000")
 
-async def make_calendar_api_request(method: str, endpoint: str, data: dict = None) -> dict:
+# Resilience: per-request timeouts (seconds), jittered exponential retry of
+# idempotent requests, and a circuit breaker that fails fast while the API is down
+CALENDAR_API_TIMEOUT = float(os.getenv("CALENDAR_API_TIMEOUT", "10"))
+CALENDAR_API_CONNECT_TIMEOUT = float(os.getenv("CALENDAR_API_CONNECT_TIMEOUT", "3"))
+CALENDAR_API_RETRIES = int(os.getenv("CALENDAR_API_RETRIES", "2"))
+CALENDAR_API_RETRY_BACKOFF = float(os.getenv("CALENDAR_API_RETRY_BACKOFF", "0.2"))
+CALENDAR_API_RETRY_MAX_BACKOFF = float(os.getenv("CALENDAR_API_RETRY_MAX_BACKOFF", "2"))
+CALENDAR_API_BREAKER_THRESHOLD = int(os.getenv("CALENDAR_API_BREAKER_THRESHOLD", "5"))
+CALENDAR_API_BREAKER_COOLDOWN = float(os.getenv("CALENDAR_API_BREAKER_COOLDOWN", "15"))
+
+# PATCH only ever sets fields to the given values, so repeating it is harmless.
+# A retried DELETE that finds nothing counts as done: the attempt whose
+# response was lost may have deleted the event.
+IDEMPOTENT_METHODS = ("GET", "PUT", "PATCH", "DELETE")
+TRANSIENT_STATUSES = (500, 502, 503, 504)
+
+# Instrumentation: seconds between metric summaries on stderr (0 = off; HTTP
+# transports also serve /metrics), and an optional sampling profiler writing
+# folded stacks for flame graphs
+MCP_METRICS_INTERVAL = float(os.getenv("MCP_METRICS_INTERVAL", "0"))
+MCP_PROFILE_INTERVAL = float(os.getenv("MCP_PROFILE_INTERVAL", "0"))
+MCP_PROFILE_OUTPUT = os.getenv("MCP_PROFILE_OUTPUT", "mcp-profile.folded")
+
+# Transport: stdio (one agent per process) or streamable-http / sse (many
+# agents sharing one process, event loop and API connection pool)
+MCP_TRANSPORT = os.getenv("MCP_TRANSPORT", "stdio")
+MCP_HOST = os.getenv("MCP_HOST", "127.0.0.1")
+MCP_PORT = int(os.getenv("MCP_PORT", "8080"))
+# Answer streamable HTTP requests with plain JSON instead of an SSE stream; the
+# tools never send progress notifications, and it saves framing per call
+MCP_JSON_RESPONSE = os.getenv("MCP_JSON_RESPONSE", "true").lower() in ("1", "true", "yes", "on")
+
+# Connection pool shared by every tool call while the server runs
+CALENDAR_API_POOL_LIMIT = int(os.getenv("CALENDAR_API_POOL_LIMIT", "100"))
+CALENDAR_API_POOL_LIMIT_PER_HOST = int(os.getenv("CALENDAR_API_POOL_LIMIT_PER_HOST", "20"))
+CALENDAR_API_DNS_CACHE_TTL = int(os.getenv("CALENDAR_API_DNS_CACHE_TTL", "300"))
+CALENDAR_API_KEEPALIVE_TIMEOUT = float(os.getenv("CALENDAR_API_KEEPALIVE_TIMEOUT", "30"))
+http_session: aiohttp.ClientSession | None = None
+
+# Batch tools send BULK_CHUNK_SIZE events per bulk API request, with at most
+# CALENDAR_API_CONCURRENCY requests in flight
+CALENDAR_API_CONCURRENCY = int(os.getenv("CALENDAR_API_CONCURRENCY", "8"))
+BULK_CHUNK_SIZE = 100
+
+# Listing tools return pages of at most MAX_PAGE_SIZE events; JSON output
+# carries DEFAULT_JSON_FIELDS unless the caller asks for others
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
+EVENT_FIELDS = ["sid", "name", "content", "category", "level", "status", "creation_time", "start_time", "end_time",
+                "rrule", "exdates"]
+DEFAULT_JSON_FIELDS = ["sid", "name", "category", "level", "status", "start_time", "end_time"]
+
+EVENT_CATEGORIES = ["Lecture", "Lab", "Meeting", "Office Hours", "Assignment", "Defense", "Workshop", "Study Group", "Seminar", "Grading", "Advising"]
+
+# Read-through cache of Calendar API GET responses
+CALENDAR_CACHE_TTL = float(os.getenv("CALENDAR_CACHE_TTL", "15"))
+CALENDAR_CACHE_SIZE = int(os.getenv("CALENDAR_CACHE_SIZE", "256"))
+# Follow the API's change stream and drop cached entries as soon as anyone
+# writes, instead of serving them until the TTL runs out
+CALENDAR_CHANGE_FEED = os.getenv("CALENDAR_CHANGE_FEED", "false").lower() in ("1", "true", "yes", "on")
+
+# Listings whose results any write can change
+SCHEDULE_LISTINGS = ("/schedules", "/schedules/search", "/schedules/stats", "/schedules/conflicts",
+                     "/schedules/free")
+
+class ScheduleCache:
+    """LRU cache of GET responses, fresh for `ttl` seconds and revalidated by ETag after that."""
+    
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # key -> [expires_at, etag, body, event index built from body]
+        self.entries: OrderedDict[tuple, list] = OrderedDict()
+        self.hits = self.misses = self.revalidated = self.evictions = 0
+        # Advanced by every invalidation. A GET records it before asking the
+        # API, and its response isn't kept if a write happened meanwhile:
+        # the body may predate the write.
+        self.generation = 0
+    
+    @staticmethod
+    def key(endpoint: str, params: dict = None) -> tuple:
+        params = {k: v for k, v in (params or {}).items() if k != "stream"}
+        return endpoint, tuple(sorted(params.items()))
+    
+    def get(self, key: tuple) -> list | None:
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+    
+    def is_fresh(self, entry: list) -> bool:
+        return time.monotonic() < entry[0]
+    
+    def store(self, key: tuple, body: Any, etag: str = None, generation: int = None):
+        if generation is not None and generation != self.generation:
+            return
+        self.entries[key] = [time.monotonic() + self.ttl, etag, body, None]
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+    
+    def refresh(self, key: tuple, entry: list, generation: int = None) -> Any:
+        """Keep a revalidated entry fresh for another TTL, unless a write has dropped it meanwhile."""
+        if (generation is None or generation == self.generation) and self.entries.get(key) is entry:
+            entry[0] = time.monotonic() + self.ttl
+        return entry[2]
+    
+    def record(self, counter: str, endpoint: str):
+        setattr(self, counter, getattr(self, counter) + 1)
+        outcome = {"hits": "hit", "misses": "miss"}.get(counter, counter)
+        logger.info(f"🗄️ Cache {outcome}: GET {endpoint} "
+                    f"(hits={self.hits}, misses={self.misses}, revalidated={self.revalidated}, "
+                    f"evictions={self.evictions}, entries={len(self.entries)})")
+    
+    def invalidate(self, method: str, endpoint: str, result: Any = None):
+        """Drop what a write can have changed; the written event's own entry is patched in place."""
+        self.generation += 1
+        written = None
+        if method == "POST" and endpoint == "/schedules" and isinstance(result, dict):
+            written = result.get("sid")
+        elif method in ("PUT", "PATCH", "DELETE") and endpoint.startswith("/schedules/") and not endpoint.startswith("/schedules/bulk"):
+            written = endpoint[len("/schedules/"):]
+        
+        # Writing one occurrence ('<sid>@<start>') changes its series' exdates,
+        # and writing a series changes all of its occurrences
+        related = (f"/schedules/{written.rpartition('@')[0]}", f"/schedules/{written}@") if written else ()
+        for key in list(self.entries):
+            path = key[0]
+            # Bulk writes can touch any event, so they drop every schedule entry
+            if path in SCHEDULE_LISTINGS or (written is None and path.startswith("/schedules")):
+                del self.entries[key]
+            elif related and (path == related[0] or path.startswith(related[1])):
+                del self.entries[key]
+        
+        if written is not None:
+            detail = self.key(f"/schedules/{written}")
+            if method == "DELETE" or not isinstance(result, dict):
+                self.entries.pop(detail, None)
+            else:
+                self.store(detail, [result])
+    
+    def apply_change(self, change: dict):
+        """Drop what a write from the API's change feed can have changed, whoever made it."""
+        method = "DELETE" if change.get("op") == "delete" else "PUT"
+        self.invalidate(method, f"/schedules/{change['sid']}")
+    
+    def clear(self):
+        self.generation += 1
+        self.entries.clear()
+
+schedule_cache = ScheduleCache(CALENDAR_CACHE_TTL, CALENDAR_CACHE_SIZE)
+
+class CalendarAPIError(ValueError):
+    """A failed Calendar API call. Transient failures (no response, timeouts, 5xx) may be retried."""
+    
+    def __init__(self, message: str, status: int = None, transient: bool = False):
+        super().__init__(message)
+        self.status = status
+        self.transient = transient
+
+class CircuitOpenError(CalendarAPIError):
+    pass
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive transient failures and fails fast; after `cooldown`
+    seconds one probe request is let through, which closes it again on success."""
+    
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+    
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if self.probing else "open"
+    
+    def before_request(self) -> bool:
+        """Raise CircuitOpenError while open; returns True if this request is the recovery probe."""
+        if self.opened_at is None:
+            return False
+        if self.probing or time.monotonic() - self.opened_at < self.cooldown:
+            raise CircuitOpenError("Calendar API is unavailable (circuit open), failing fast")
+        self.probing = True
+        logger.info("🔌 Circuit half-open: probing the Calendar API")
+        return True
+    
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.info("🔌 Circuit closed: Calendar API recovered")
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+    
+    def record_failure(self):
+        self.failures += 1
+        if self.probing or (self.opened_at is None and self.failures >= self.threshold):
+            logger.warning(f"🔌 Circuit open after {self.failures} consecutive failures; "
+                           f"failing fast for {self.cooldown:g}s")
+            self.opened_at = time.monotonic()
+            self.probing = False
+    
+    def release_probe(self):
+        # A probe that ended without an answer (e.g. cancelled) leaves the circuit open
+        self.probing = False
+
+circuit_breaker = CircuitBreaker(CALENDAR_API_BREAKER_THRESHOLD, CALENDAR_API_BREAKER_COOLDOWN)
+
+class SingleFlight:
+    """Lets concurrent identical reads share one in-flight request and its parsed result."""
+    
+    def __init__(self):
+        self.calls: dict[tuple, asyncio.Task] = {}
+        self.requests = self.coalesced = 0
+    
+    async def do(self, key: tuple, fetch):
+        task = self.calls.get(key)
+        if task is not None:
+            self.coalesced += 1
+            logger.info(f"🔗 Coalesced GET {key[0]} with an in-flight request "
+                        f"(requests={self.requests}, coalesced={self.coalesced}, in_flight={len(self.calls)})")
+            return await asyncio.shield(task)
+        
+        task = asyncio.ensure_future(fetch())
+        # Followers still get the result if the caller that started it is cancelled
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self.calls[key] = task
+        self.requests += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if self.calls.get(key) is task:
+                del self.calls[key]
+
+single_flight = SingleFlight()
+
+class Histogram:
+    """Prometheus-style histogram with one series per label tuple."""
+    
+    BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        # labels -> [count per bucket..., count above the last bucket, sum, count]
+        self.series: dict[tuple, list] = {}
+    
+    def observe(self, labels: tuple, value: float):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(self.BUCKETS) + 1) + [0.0, 0]
+        series[bisect.bisect_left(self.BUCKETS, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+    
+    def expose(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self.series.items()):
+            label_text = ",".join(f'{k}="{v}"' for k, v in zip(self.label_names, labels))
+            cumulative = 0
+            for bound, count in zip(self.BUCKETS, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{label_text},le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{{{label_text}}} {series[-1]}")
+        return lines
+
+# Phase durations of the tool call running in the current task, filled in by
+# timed_phase() and the API helpers
+current_phases: contextvars.ContextVar[dict | None] = contextvars.ContextVar("current_phases", default=None)
+
+@contextlib.contextmanager
+def timed_phase(phase: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_phase_time(phase, time.perf_counter() - start)
+
+def add_phase_time(phase: str, seconds: float):
+    phases = current_phases.get()
+    if phases is not None:
+        phases[phase] = phases.get(phase, 0.0) + seconds
+
+def phase_time(phase: str) -> float:
+    phases = current_phases.get()
+    return phases.get(phase, 0.0) if phases is not None else 0.0
+
+class Metrics:
+    """Tool and Calendar API latency, exposed in Prometheus text format or as a log summary."""
+    
+    def __init__(self):
+        self.tool_duration = Histogram("mcp_tool_duration_seconds", "Tool call latency", ("tool", "status"))
+        self.tool_phase = Histogram("mcp_tool_phase_seconds",
+                                    "Time per tool call spent waiting on the API, decoding, indexing, rendering and other work",
+                                    ("tool", "phase"))
+        self.api_duration = Histogram("calendar_api_request_duration_seconds",
+                                      "Calendar API request latency per attempt", ("method", "endpoint", "status"))
+    
+    def observe_tool(self, tool: str, status: str, seconds: float, phases: dict):
+        self.tool_duration.observe((tool, status), seconds)
+        for phase, phase_seconds in phases.items():
+            self.tool_phase.observe((tool, phase), phase_seconds)
+        self.tool_phase.observe((tool, "other"), max(0.0, seconds - sum(phases.values())))
+    
+    def observe_api(self, method: str, endpoint: str, status: int | str, seconds: float):
+        # Event ids would make a series per event, so detail paths share one label
+        if endpoint.startswith("/schedules/") and endpoint not in SCHEDULE_LISTINGS and not endpoint.startswith("/schedules/bulk"):
+            endpoint = "/schedules/{id}"
+        self.api_duration.observe((method, endpoint, str(status)), seconds)
+    
+    def render(self) -> str:
+        lines = []
+        for histogram in (self.tool_duration, self.tool_phase, self.api_duration):
+            lines += histogram.expose()
+        counters = [
+            ("calendar_cache_lookups_total", "Response cache lookups by outcome", "outcome",
+             {"hit": schedule_cache.hits, "miss": schedule_cache.misses, "revalidated": schedule_cache.revalidated}),
+            ("calendar_cache_evictions_total", "Response cache evictions", None, schedule_cache.evictions),
+            ("calendar_api_coalesced_total", "GETs that shared another call's in-flight request", None, single_flight.coalesced),
+        ]
+        for name, help_text, label, values in counters:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            if label is None:
+                lines.append(f"{name} {values}")
+            else:
+                lines += [f'{name}{{{label}="{k}"}} {v}' for k, v in values.items()]
+        lines += ["# HELP calendar_api_circuit_open Whether the Calendar API circuit breaker is open",
+                  "# TYPE calendar_api_circuit_open gauge",
+                  f"calendar_api_circuit_open {int(circuit_breaker.state != 'closed')}"]
+        return "\n".join(lines) + "\n"
+    
+    def summary(self) -> list[str]:
+        """One line per tool and per API method/endpoint/status, with mean times per call in ms."""
+        lines = []
+        calls, phases = {}, {}
+        for (tool, status), series in self.tool_duration.series.items():
+            calls[tool] = calls.get(tool, 0) + series[-1]
+        for (tool, phase), series in self.tool_phase.series.items():
+            phases.setdefault(tool, []).append(f"{phase} {series[-2] / calls[tool] * 1000:.2f}")
+        for (tool, status), series in sorted(self.tool_duration.series.items()):
+            lines.append(f"📊 {tool} [{status}]: {series[-1]} calls, mean {series[-2] / series[-1] * 1000:.2f}ms "
+                         f"({', '.join(sorted(phases.get(tool, [])))})")
+        for (method, endpoint, status), series in sorted(self.api_duration.series.items()):
+            lines.append(f"📡 {method} {endpoint} {status}: {series[-1]} requests, mean {series[-2] / series[-1] * 1000:.2f}ms")
+        return lines
+
+metrics = Metrics()
+
+async def follow_change_feed():
+    """Apply the Calendar API's change stream (server-sent events) to the response cache, reconnecting as needed."""
+    since = None
+    timeout = aiohttp.ClientTimeout(total=None, connect=CALENDAR_API_CONNECT_TIMEOUT, sock_read=60)
+    while True:
+        params = {} if since is None else {"since": since}
+        try:
+            async with api_session() as session:
+                async with session.get(f"{CALENDAR_API_BASE_URL}/schedules/changes/stream", params=params,
+                                       timeout=timeout) as response:
+                    if response.status == 410:
+                        # Missed more changes than the API keeps: start over with an empty cache
+                        logger.warning("🔄 Change feed fell behind, clearing the cache")
+                        schedule_cache.clear()
+                        since = None
+                        continue
+                    response.raise_for_status()
+                    event, data = None, []
+                    async for raw in response.content:
+                        line = raw.decode().rstrip("\r\n")
+                        if line:
+                            field, _, value = line.partition(":")
+                            if field == "event":
+                                event = value.strip()
+                            elif field == "data":
+                                data.append(value.strip())
+                            continue
+                        # A blank line ends the event
+                        payload = json.loads("\n".join(data)) if data else {}
+                        if event == "ready":
+                            since = payload["since"]
+                        elif event == "change":
+                            schedule_cache.apply_change(payload)
+                            since = payload["seq"]
+                        elif event == "reset":
+                            logger.warning("🔄 Change feed fell behind, clearing the cache")
+                            schedule_cache.clear()
+                            since = None
+                            break
+                        event, data = None, []
+        except Exception as e:
+            logger.warning(f"⚠️ Change feed disconnected: {as_api_error(e)}")
+        await asyncio.sleep(CALENDAR_API_RETRY_MAX_BACKOFF)
+
+async def log_metrics_periodically(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        for line in metrics.summary():
+            logger.info(line)
+
+class SamplingProfiler:
+    """Samples the main thread's stack on a CPU-time timer and counts folded stacks
+    (frame;frame;frame count), the input format of flamegraph.pl and speedscope."""
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: dict[str, int] = {}
+    
+    def start(self):
+        signal.signal(signal.SIGPROF, self.sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        logger.info(f"🔥 Sampling profiler on every {self.interval * 1000:g}ms of CPU time")
+    
+    def stop(self):
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+    
+    def sample(self, signum, frame):
+        names = []
+        while frame is not None:
+            names.append(f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}")
+            frame = frame.f_back
+        stack = ";".join(reversed(names))
+        self.stacks[stack] = self.stacks.get(stack, 0) + 1
+    
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+    
+    def write(self, path: str):
+        with open(path, "w") as f:
+            f.write(self.folded())
+        logger.info(f"🔥 Wrote {sum(self.stacks.values())} profile samples to {path}")
+
+profiler = SamplingProfiler(MCP_PROFILE_INTERVAL) if MCP_PROFILE_INTERVAL > 0 and hasattr(signal, "setitimer") else None
+
+class EventIndex:
+    """Events sorted by start time, for logarithmic date and window lookups."""
+    
+    def __init__(self, events: list[dict]):
+        # 'YYYY-MM-DD HH:MM:SS' strings sort chronologically, so times are only
+        # parsed once here, to skip malformed ones
+        self.events = []
+        for event in events:
+            try:
+                datetime.strptime(event["start_time"], "%Y-%m-%d %H:%M:%S")
+                datetime.strptime(event["end_time"], "%Y-%m-%d %H:%M:%S")
+            except (KeyError, ValueError):
+                continue  # Skip events with invalid dates
+            self.events.append(event)
+        # sid breaks ties so (start_time, sid) can resume a page
+        self.events.sort(key=lambda e: (e["start_time"], e["sid"]))
+        self.starts = [e["start_time"] for e in self.events]
+        self.keys = [(e["start_time"], e["sid"]) for e in self.events]
+    
+    def starting(self, start: datetime, end: datetime) -> list[dict]:
+        """Events starting in [start, end), in start order."""
+        lo = bisect.bisect_left(self.starts, start.strftime("%Y-%m-%d %H:%M:%S"))
+        hi = bisect.bisect_left(self.starts, end.strftime("%Y-%m-%d %H:%M:%S"), lo)
+        return self.events[lo:hi]
+    
+    def iter_starting(self, start: datetime, end: datetime, after: tuple = None):
+        """Lazily yield events starting in [start, end), resuming after an (start_time, sid) key."""
+        lo = bisect.bisect_left(self.starts, start.strftime("%Y-%m-%d %H:%M:%S"))
+        if after is not None:
+            lo = max(lo, bisect.bisect_right(self.keys, tuple(after)))
+        end_str = end.strftime("%Y-%m-%d %H:%M:%S")
+        for i in range(lo, len(self.events)):
+            if self.starts[i] >= end_str:
+                return
+            yield self.events[i]
+
+def new_http_session() -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=CALENDAR_API_POOL_LIMIT,
+        limit_per_host=CALENDAR_API_POOL_LIMIT_PER_HOST,
+        ttl_dns_cache=CALENDAR_API_DNS_CACHE_TTL,
+        keepalive_timeout=CALENDAR_API_KEEPALIVE_TIMEOUT,
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+async def open_http_session():
+    """Open the process-wide keep-alive session used for Calendar API calls."""
+    global http_session
+    if http_session is None or http_session.closed:
+        http_session = new_http_session()
+    return http_session
+
+async def close_http_session():
+    global http_session
+    if http_session is not None:
+        await http_session.close()
+        http_session = None
+
+@contextlib.asynccontextmanager
+async def api_session():
+    """Yield the shared session, or a one-off session when none is open (e.g. in tests)."""
+    if http_session is not None and not http_session.closed:
+        yield http_session
+    else:
+        async with new_http_session() as session:
+            yield session
+
+def as_api_error(e: Exception) -> CalendarAPIError:
+    if isinstance(e, CalendarAPIError):
+        return e
+    if isinstance(e, asyncio.TimeoutError):
+        return CalendarAPIError(f"timed out after {CALENDAR_API_TIMEOUT:g}s", transient=True)
+    if isinstance(e, aiohttp.ClientError):
+        return CalendarAPIError(f"{type(e).__name__}: {e}", transient=True)
+    return CalendarAPIError(str(e))
+
+def api_error_status(e: Exception, status: int | str) -> int | str:
+    """Status label of a failed attempt for the API latency histogram."""
+    if isinstance(e, asyncio.TimeoutError):
+        return "timeout"
+    return status
+
+def status_error(status: int) -> CalendarAPIError:
+    return CalendarAPIError(f"API request failed with status {status}", status, transient=status in TRANSIENT_STATUSES)
+
+async def retry_or_raise(method: str, url: str, e: Exception, attempt: int):
+    """Record a failed attempt and back off before the next one, or raise if it shouldn't be retried."""
+    error = as_api_error(e)
+    if error.transient:
+        circuit_breaker.record_failure()
+    elif not isinstance(error, CircuitOpenError):
+        circuit_breaker.record_success()  # The API answered, just not with a 200
+    retries = CALENDAR_API_RETRIES if method in IDEMPOTENT_METHODS else 0
+    if not error.transient or attempt >= retries:
+        raise error
+    # Full jitter keeps many agents from retrying a recovering API in lockstep
+    delay = random.uniform(0, min(CALENDAR_API_RETRY_MAX_BACKOFF, CALENDAR_API_RETRY_BACKOFF * 2 ** attempt))
+    logger.warning(f"🔁 {method} {url} failed ({error}); retry {attempt + 1}/{retries} in {delay:.2f}s")
+    await asyncio.sleep(delay)
+
+async def make_calendar_api_request(method: str, endpoint: str, data: dict = None, params: dict = None) -> dict:
     """Make a request to the Calendar API."""
+    method = method.upper()
     url = f"{CALENDAR_API_BASE_URL}{endpoint}"
     headers = {
         "Content-Type": "application/json"
     }
+    timeout = aiohttp.ClientTimeout(total=CALENDAR_API_TIMEOUT, connect=CALENDAR_API_CONNECT_TIMEOUT)
     
     try:
-        async with aiohttp.ClientSession() as session:
-            if method.upper() == "GET":
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        raise ValueError(f"API request failed with status {response.status}")
-            elif method.upper() == "POST":
-                async with session.post(url, headers=headers, json=data) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        raise ValueError(f"API request failed with status {response.status}")
-            elif method.upper() == "PUT":
-                async with session.put(url, headers=headers, json=data) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        raise ValueError(f"API request failed with status {response.status}")
-            elif method.upper() == "DELETE":
-                async with session.delete(url, headers=headers) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        raise ValueError(f"API request failed with status {response.status}")
+        cached = None
+        if method == "GET":
+            cache_key = schedule_cache.key(endpoint, params)
+            cached = schedule_cache.get(cache_key)
+            if cached and schedule_cache.is_fresh(cached):
+                schedule_cache.record("hits", endpoint)
+                return cached[2]
+            generation = schedule_cache.generation
+            if cached and cached[1]:
+                headers["If-None-Match"] = cached[1]
+        
+        async def send():
+            for attempt in range(CALENDAR_API_RETRIES + 1):
+                try:
+                    probe = circuit_breaker.before_request()
+                except CircuitOpenError:
+                    metrics.observe_api(method, endpoint, "circuit_open", 0.0)
+                    raise
+                started = time.perf_counter()
+                status = "error"
+                try:
+                    async with api_session() as session:
+                        async with session.request(method, url, headers=headers, params=params, json=data,
+                                                   timeout=timeout) as response:
+                            status = response.status
+                            if response.status == 304 and cached:
+                                circuit_breaker.record_success()
+                                schedule_cache.record("revalidated", endpoint)
+                                return schedule_cache.refresh(cache_key, cached, generation)
+                            if response.status == 404 and method == "DELETE" and attempt > 0:
+                                logger.warning(f"🔁 {method} {url} found nothing to delete on retry; "
+                                               f"treating it as deleted by the earlier attempt")
+                                body, etag = b'{"message": "Schedule deleted successfully"}', None
+                            elif response.status != 200:
+                                raise status_error(response.status)
+                            else:
+                                body = await response.read()
+                                etag = response.headers.get("ETag")
+                    circuit_breaker.record_success()
+                    break
+                except Exception as e:
+                    status = api_error_status(e, status)
+                    await retry_or_raise(method, url, e, attempt)
+                finally:
+                    metrics.observe_api(method, endpoint, status, time.perf_counter() - started)
+                    if probe:
+                        circuit_breaker.release_probe()
+            
+            with timed_phase("decode"):
+                result = json.loads(body)
+            if method == "GET":
+                schedule_cache.store(cache_key, result, etag, generation)
+                schedule_cache.record("misses", endpoint)
+            else:
+                schedule_cache.invalidate(method, endpoint, result)
+            return result
+        
+        # Time spent waiting on the API, retries and backoff included; decoding
+        # is booked separately by send()
+        started = time.perf_counter()
+        decoded = phase_time("decode")
+        try:
+            if method == "GET":
+                return await single_flight.do(cache_key, send)
+            return await send()
+        finally:
+            add_phase_time("api", time.perf_counter() - started - (phase_time("decode") - decoded))
     except Exception as e:
         logger.error(f"Calendar API request failed: {e}")
-        raise ValueError(f"Calendar API request failed: {str(e)}")
+        error = as_api_error(e)
+        raise type(error)(f"Calendar API request failed: {error}", error.status, error.transient) from e
 
-@server.list_tools()
-async def handle_list_tools() -> list[types.Tool]:
-    """List available calendar tools."""
+async def stream_calendar_api_request(endpoint: str, params: dict = None):
+    """Yield rows from a Calendar API listing as they arrive, using its NDJSON stream."""
+    url = f"{CALENDAR_API_BASE_URL}{endpoint}"
+    # Shares its cache entry with the same listing fetched without streaming
+    cache_key = schedule_cache.key(endpoint, params)
+    cached = schedule_cache.get(cache_key)
+    if cached and schedule_cache.is_fresh(cached):
+        schedule_cache.record("hits", endpoint)
+        for row in cached[2]:
+            yield row
+        return
+    generation = schedule_cache.generation
+    headers = {"If-None-Match": cached[1]} if cached and cached[1] else {}
+    params = dict(params or {}, stream="ndjson")
+    # The timeout applies to each read, not the whole (possibly long) stream
+    timeout = aiohttp.ClientTimeout(total=None, connect=CALENDAR_API_CONNECT_TIMEOUT, sock_read=CALENDAR_API_TIMEOUT)
+    
+    rows = []
+    # Time inside the generator only: the consumer's work between rows is not
+    # the API's, so time spent suspended at a yield is left out
+    started = time.perf_counter()
+    suspended = decoding = 0.0
+    try:
+        for attempt in range(CALENDAR_API_RETRIES + 1):
+            try:
+                probe = circuit_breaker.before_request()
+            except CircuitOpenError:
+                metrics.observe_api("GET", endpoint, "circuit_open", 0.0)
+                raise
+            attempt_started = time.perf_counter()
+            status = "error"
+            try:
+                async with api_session() as session:
+                    async with session.get(url, headers=headers, params=params, timeout=timeout) as response:
+                        status = response.status
+                        if response.status == 304 and cached:
+                            schedule_cache.record("revalidated", endpoint)
+                            rows = schedule_cache.refresh(cache_key, cached, generation)
+                        elif response.status != 200:
+                            raise status_error(response.status)
+                        else:
+                            async for line in response.content:
+                                if line.strip():
+                                    decode_started = time.perf_counter()
+                                    rows.append(json.loads(line))
+                                    yielded = time.perf_counter()
+                                    decoding += yielded - decode_started
+                                    yield rows[-1]
+                                    suspended += time.perf_counter() - yielded
+                            schedule_cache.store(cache_key, rows, response.headers.get("ETag"), generation)
+                            schedule_cache.record("misses", endpoint)
+                            circuit_breaker.record_success()
+                            return
+                circuit_breaker.record_success()
+                break
+            except Exception as e:
+                status = api_error_status(e, status)
+                # Rows already handed out can't be taken back, so only retry before the first one
+                if rows:
+                    if as_api_error(e).transient:
+                        circuit_breaker.record_failure()
+                    raise as_api_error(e)
+                await retry_or_raise("GET", url, e, attempt)
+            finally:
+                metrics.observe_api("GET", endpoint, status, time.perf_counter() - attempt_started - suspended)
+                if probe:
+                    circuit_breaker.release_probe()
+    except Exception as e:
+        logger.error(f"Calendar API stream failed: {e}")
+        error = as_api_error(e)
+        raise type(error)(f"Calendar API request failed: {error}", error.status, error.transient) from e
+    finally:
+        add_phase_time("decode", decoding)
+        add_phase_time("api", time.perf_counter() - started - suspended - decoding)
+    
+    for row in rows:
+        yield row
+
+async def get_event_index(endpoint: str, params: dict = None) -> EventIndex:
+    """Fetch a listing through the cache and return its event index, built once per refresh."""
+    key = schedule_cache.key(endpoint, params)
+    entry = schedule_cache.get(key)
+    if entry and schedule_cache.is_fresh(entry):
+        schedule_cache.record("hits", endpoint)
+    else:
+        async def fill():
+            return [row async for row in stream_calendar_api_request(endpoint, params)]
+        rows = await single_flight.do(key, fill)
+        entry = schedule_cache.get(key)
+        if entry is None:
+            return EventIndex(rows)
+    if entry[3] is None:
+        with timed_phase("index"):
+            entry[3] = EventIndex(entry[2])
+    return entry[3]
+
+def encode_cursor(position: Any) -> str:
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+def decode_cursor(cursor: str) -> Any:
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+def get_page_options(arguments: dict) -> tuple[str, list[str], int]:
+    """Output format, JSON fields and page size requested by a listing tool call, with defaults."""
+    return (arguments.get("format", "text"), arguments.get("fields") or DEFAULT_JSON_FIELDS,
+            arguments.get("limit", DEFAULT_PAGE_SIZE))
+
+def json_page(events: list[dict], fields: list[str], next_cursor: str | None) -> list[types.TextContent]:
+    """A page of events as compact JSON rows with only the requested fields."""
+    page = {"items": [{f: event.get(f) for f in fields} for event in events], "next_cursor": next_cursor}
+    return [types.TextContent(type="text", text=json.dumps(page, separators=(",", ":")))]
+
+def more_results_hint(next_cursor: str | None) -> str:
+    return f"\\n\\n➡️ More results: call again with cursor=\"{next_cursor}\"" if next_cursor else ""
+
+async def gather_bounded(coros, limit: int = None) -> list:
+    """Await coroutines concurrently, at most `limit` at a time; exceptions are returned, not raised."""
+    semaphore = asyncio.Semaphore(limit or CALENDAR_API_CONCURRENCY)
+    
+    async def run(coro):
+        async with semaphore:
+            return await coro
+    return await asyncio.gather(*(run(c) for c in coros), return_exceptions=True)
+
+async def send_bulk(method: str, events: list[dict]) -> dict[str, str | None]:
+    """Write events through the bulk endpoint in concurrent chunks; returns sid -> error (None if written)."""
+    chunks = [events[i:i + BULK_CHUNK_SIZE] for i in range(0, len(events), BULK_CHUNK_SIZE)]
+    responses = await gather_bounded(make_calendar_api_request(method, "/schedules/bulk", chunk) for chunk in chunks)
+    errors = {}
+    for chunk, response in zip(chunks, responses):
+        if isinstance(response, Exception):
+            errors.update((event["sid"], str(response)) for event in chunk)
+        else:
+            errors.update((r["sid"], None if r["ok"] else r["error"]) for r in response["results"])
+    return errors
+
+def validate_event(event: dict, required: list[str]) -> str | None:
+    """Return why an event (or partial update) would be rejected, or None."""
+    missing = [field for field in required if field not in event]
+    if missing:
+        return f"{', '.join(missing)} required"
+    if "category" in event and event["category"] not in EVENT_CATEGORIES:
+        return f"unknown category {event['category']}"
+    if "level" in event and event["level"] not in (1, 2, 3):
+        return "level must be 1, 2 or 3"
+    if "status" in event and not (isinstance(event["status"], (int, float)) and 0 <= event["status"] <= 1):
+        return "status must be between 0.0 and 1.0"
+    for field in ("start_time", "end_time"):
+        if field in event:
+            try:
+                datetime.strptime(event[field], "%Y-%m-%d %H:%M:%S")
+            except (TypeError, ValueError):
+                return f"{field} must be in YYYY-MM-DD HH:MM:SS format"
+    if "start_time" in event and "end_time" in event and event["end_time"] <= event["start_time"]:
+        return "end_time must be after start_time"
+    if event.get("rrule") and not event["rrule"].upper().removeprefix("RRULE:").startswith("FREQ="):
+        return "rrule must start with FREQ=, e.g. FREQ=WEEKLY;COUNT=15"
+    return None
+
+def new_event(arguments: dict, sid: str) -> dict:
+    return {
+        "sid": sid,
+        "name": arguments["name"],
+        "content": arguments.get("content", ""),
+        "category": arguments["category"],
+        "level": arguments["level"],
+        "status": 0.0,  # New events start as not started
+        "creation_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "start_time": arguments["start_time"],
+        "end_time": arguments["end_time"],
+        "rrule": arguments.get("rrule"),
+        "exdates": arguments.get("exdates")
+    }
+
+def format_recurrence(event: dict) -> str:
+    if not event.get("rrule"):
+        return ""
+    cancelled = f" (cancelled: {event['exdates']})" if event.get("exdates") else ""
+    return f"\n• Repeats: {event['rrule']}{cancelled}"
+
+def format_batch_results(action: str, rows: list[tuple[str, str, str | None]]) -> str:
+    """One line per item: (event id, name, error or None)."""
+    failed = sum(1 for _, _, error in rows if error)
+    summary = f"{'✅' if not failed else '⚠️'} {action} {len(rows) - failed} of {len(rows)} events"
+    if failed:
+        summary += f" ({failed} failed)"
+    lines = [
+        f"{i}. ❌ {name} ({sid}): {error}" if error else f"{i}. ✅ {name} ({sid})"
+        for i, (sid, name, error) in enumerate(rows, 1)
+    ]
+    return summary + "\\n\\n" + "\\n".join(lines)
+
+async def find_conflicts_with(start_time: str, end_time: str, exclude: str = None) -> list[dict]:
+    """Events overlapping a candidate time slot, checked by the API over its start/end index."""
+    params = {"start_time": start_time, "end_time": end_time}
+    if exclude:
+        params["exclude"] = exclude
+    result = await make_calendar_api_request("GET", "/schedules/conflicts", params=params)
+    return result["conflicts"]
+
+def format_conflicts(events: list[dict]) -> str:
+    return "\\n".join(f"• {event['name']} ({event['category']})\\n  📅 {event['start_time']} - {event['end_time']} 🆔 {event['sid']}"
+                     for event in events)
+
+def get_period_window(period: str, now: datetime) -> tuple[datetime, datetime]:
+    """Return the [start, end) dates of the week, month or semester containing now."""
+    today = datetime(now.year, now.month, now.day)
+    if period == "week":
+        start = today - timedelta(days=today.weekday())
+        return start, start + timedelta(days=7)
+    if period == "semester":
+        # Spring semester runs January-June, fall semester July-December
+        if today.month <= 6:
+            return datetime(today.year, 1, 1), datetime(today.year, 7, 1)
+        return datetime(today.year, 7, 1), datetime(today.year + 1, 1, 1)
+    start = datetime(today.year, today.month, 1)
+    end = datetime(today.year + 1, 1, 1) if today.month == 12 else datetime(today.year, today.month + 1, 1)
+    return start, end
+
+class ToolRegistry:
+    """Tool definitions, argument validators and handlers, all built once at import."""
+    
+    def __init__(self):
+        self.tools: list[types.Tool] = []
+        self.handlers: dict[str, Any] = {}
+        self.validators: dict[str, Any] = {}
+        self.item_validators: dict[str, Any] = {}
+    
+    @staticmethod
+    def compile(schema: dict):
+        validator_class = jsonschema.validators.validator_for(schema)
+        # Checking the schema itself is the expensive part, so it happens once here
+        validator_class.check_schema(schema)
+        return validator_class(schema)
+    
+    @staticmethod
+    def schema_error(validator, instance: Any) -> str | None:
+        """The most relevant reason `instance` fails `validator`, or None if it passes."""
+        if validator.is_valid(instance):
+            return None
+        error = jsonschema.exceptions.best_match(validator.iter_errors(instance))
+        where = "/".join(str(p) for p in error.absolute_path)
+        return f"{f'{where}: ' if where else ''}{error.message}"
+    
+    def tool(self, name: str, description: str, properties: dict, required: list[str] = None, validate: dict = None,
+             item_schema: dict = None):
+        """Register the decorated coroutine as a tool. Arguments are checked against `validate`
+        when given (a looser schema than the one advertised), else against the input schema.
+        Batch tools also get `item_schema`, which their handlers check each item against."""
+        schema = {"type": "object", "properties": properties}
+        if required:
+            schema["required"] = required
+        validator = self.compile(validate or schema)
+        item_validator = self.compile(item_schema) if item_schema else None
+        
+        def decorator(handler):
+            self.tools.append(types.Tool(name=name, description=description, inputSchema=schema))
+            self.validators[name] = validator
+            if item_validator:
+                self.item_validators[name] = item_validator
+            self.handlers[name] = handler
+            return handler
+        return decorator
+    
+    def item_error(self, name: str, item: Any) -> str | None:
+        """Why one item of a batch tool's arguments fails its item schema, or None."""
+        return self.schema_error(self.item_validators[name], item)
+    
+    async def call(self, name: str, arguments: dict) -> list[types.TextContent]:
+        handler = self.handlers.get(name)
+        if handler is None:
+            raise ValueError(f"Unknown tool: {name}")
+        validator = self.validators[name]
+        if not validator.is_valid(arguments):
+            error = jsonschema.exceptions.best_match(validator.iter_errors(arguments))
+            where = "/".join(str(p) for p in error.absolute_path)
+            raise ValueError(f"Invalid arguments{f' at {where}' if where else ''}: {error.message}")
+        return await handler(arguments)
+
+tool_registry = ToolRegistry()
+
+# Schema fragments shared by several tools
+CATEGORY_PROPERTY = {
+    "type": "string",
+    "enum": EVENT_CATEGORIES,
+    "description": "Event category"
+}
+CATEGORY_FILTER_PROPERTY = {**CATEGORY_PROPERTY, "description": "Filter by event category (optional)"}
+EVENT_PROPERTIES = {
+    "name": {
+        "type": "string",
+        "description": "Event name/title"
+    },
+    "content": {
+        "type": "string",
+        "description": "Event description/details"
+    },
+    "category": CATEGORY_PROPERTY,
+    "level": {
+        "type": "integer",
+        "enum": [1, 2, 3],
+        "description": "Priority level (1=Low, 2=Medium, 3=High)"
+    },
+    "start_time": {
+        "type": "string",
+        "description": "Start time in YYYY-MM-DD HH:MM:SS format"
+    },
+    "end_time": {
+        "type": "string",
+        "description": "End time in YYYY-MM-DD HH:MM:SS format"
+    },
+    "rrule": {
+        "type": "string",
+        "description": "Repeat the event: FREQ=DAILY or FREQ=WEEKLY, optionally INTERVAL=n, BYDAY=MO,WE (weekly) and COUNT=n or UNTIL=YYYYMMDD, e.g. FREQ=WEEKLY;BYDAY=MO,WE;COUNT=30 for a 15-week course. Stored as one event; the date tools list each occurrence as <event_id>@<YYYYMMDDTHHMMSS>. An empty string stops repeating"
+    },
+    "exdates": {
+        "type": "string",
+        "description": "Comma-separated dates (YYYY-MM-DD) or start times of cancelled occurrences of a repeating event"
+    }
+}
+STATUS_PROPERTY = {
+    "type": "number",
+    "minimum": 0.0,
+    "maximum": 1.0,
+    "description": "Completion status (0.0=Not Started, 0.5=In Progress, 1.0=Completed)"
+}
+CREATE_EVENT_REQUIRED = ["name", "category", "level", "start_time", "end_time"]
+# The batch tools take arrays of the same objects as create_event / update_event
+CREATE_EVENT_SCHEMA = {"type": "object", "properties": EVENT_PROPERTIES, "required": CREATE_EVENT_REQUIRED}
+UPDATE_EVENT_PROPERTIES = {
+    "event_id": {
+        "type": "string",
+        "description": "Event ID to update"
+    },
+    **EVENT_PROPERTIES,
+    "status": STATUS_PROPERTY
+}
+UPDATE_EVENT_SCHEMA = {"type": "object", "properties": UPDATE_EVENT_PROPERTIES, "required": ["event_id"]}
+# Paging and output options shared by the listing tools
+PAGE_PROPERTIES = {
+    "format": {
+        "type": "string",
+        "enum": ["text", "json"],
+        "description": "text (default) for a readable summary, json for compact rows: {\"items\": [...], \"next_cursor\": ...}"
+    },
+    "fields": {
+        "type": "array",
+        "items": {"type": "string", "enum": EVENT_FIELDS},
+        "description": f"Fields included in json rows (default: {', '.join(DEFAULT_JSON_FIELDS)})"
+    },
+    "limit": {
+        "type": "integer",
+        "minimum": 1,
+        "maximum": MAX_PAGE_SIZE,
+        "description": f"Events per page (default: {DEFAULT_PAGE_SIZE})"
+    },
+    "cursor": {
+        "type": "string",
+        "description": "next_cursor from the previous page, to continue the same listing"
+    }
+}
+
+# The batch tools check their items one by one (against the item schema
+# registered with the tool), so that one bad event is reported in its own
+# result line instead of failing the whole batch
+BATCH_ARGUMENTS_SCHEMA = {
+    "type": "object",
+    "properties": {"events": {"type": "array", "items": {"type": "object"}, "minItems": 1, "maxItems": 1000}},
+    "required": ["events"]
+}
+
+def batch_properties(items: dict, description: str) -> dict:
+    return {
+        "events": {
+            "type": "array",
+            "items": items,
+            "minItems": 1,
+            "maxItems": 1000,
+            "description": description
+        }
+    }
+
+@tool_registry.tool(
+    "get_all_events",
+    "Get all events/schedules from the Redwood Digital University calendar",
+    {
+        "category": CATEGORY_FILTER_PROPERTY,
+        "status": {
+            "type": "string",
+            "enum": ["not_started", "in_progress", "completed"],
+            "description": "Filter by completion status (optional)"
+        },
+        **PAGE_PROPERTIES
+    }
+)
+async def get_all_events(arguments: dict) -> list[types.TextContent]:
+    output_format, fields, limit = get_page_options(arguments)
+    
+    # Filter and page on the API side; its keyset cursor is passed through
+    params = {"limit": limit}
+    if "category" in arguments:
+        params["category"] = arguments["category"]
+    if "status" in arguments:
+        params["status"] = arguments["status"]
+    if arguments.get("cursor"):
+        params["cursor"] = arguments["cursor"]
+    
+    result = await make_calendar_api_request("GET", "/schedules", params=params)
+    
+    events = result.get("items", []) if isinstance(result, dict) else []
+    next_cursor = result.get("next_cursor") if isinstance(result, dict) else None
+    
+    if output_format == "json":
+        return json_page(events, fields, next_cursor)
+    
+    summary = f"Found {len(events)}{'+' if next_cursor else ''} events in Redwood Digital University calendar"
+    
+    event_list = "\\n".join([
+        f"• {event['name']} ({event['category']})\\n"
+        f"  📅 {event['start_time']} - {event['end_time']}\\n"
+        f"  📋 {event.get('content', 'No description')}\\n"
+        f"  🎯 Priority: {['', 'Low', 'Medium', 'High'][event.get('level', 1)]}\\n"
+        f"  ✅ Status: {int(event.get('status', 0) * 100)}% complete\\n"
+        for event in events
+    ])
+    
     return [
-        types.Tool(
-            name="get_all_events",
-            description="Get all events/schedules from the Redwood Digital University calendar",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "category": {
-                        "type": "string",
-                        "enum": ["Lecture", "Lab", "Meeting", "Office Hours", "Assignment", "Defense", "Workshop", "Study Group", "Seminar", "Grading", "Advising"],
-                        "description": "Filter by event category (optional)"
-                    },
-                    "status": {
-                        "type": "string",
-                        "enum": ["not_started", "in_progress", "completed"],
-                        "description": "Filter by completion status (optional)"
-                    }
-                }
-            }
-        ),
-        types.Tool(
-            name="get_event",
-            description="Get detailed information about a specific event by ID",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "event_id": {
-                        "type": "string",
-                        "description": "Event ID to retrieve"
-                    }
-                },
-                "required": ["event_id"]
-            }
-        ),
-        types.Tool(
-            name="create_event",
-            description="Create a new academic event in the calendar",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "name": {
-                        "type": "string",
-                        "description": "Event name/title"
-                    },
-                    "content": {
-                        "type": "string",
-                        "description": "Event description/details"
-                    },
-                    "category": {
-                        "type": "string",
-                        "enum": ["Lecture", "Lab", "Meeting", "Office Hours", "Assignment", "Defense", "Workshop", "Study Group", "Seminar", "Grading", "Advising"],
-                        "description": "Event category"
-                    },
-                    "level": {
-                        "type": "integer",
-                        "enum": [1, 2, 3],
-                        "description": "Priority level (1=Low, 2=Medium, 3=High)"
-                    },
-                    "start_time": {
-                        "type": "string",
-                        "description": "Start time in YYYY-MM-DD HH:MM:SS format"
-                    },
-                    "end_time": {
-                        "type": "string",
-                        "description": "End time in YYYY-MM-DD HH:MM:SS format"
-                    }
-                },
-                "required": ["name", "category", "level", "start_time", "end_time"]
-            }
-        ),
-        types.Tool(
-            name="update_event",
-            description="Update an existing event in the calendar",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "event_id": {
-                        "type": "string",
-                        "description": "Event ID to update"
-                    },
-                    "name": {
-                        "type": "string",
-                        "description": "Event name/title"
-                    },
-                    "content": {
-                        "type": "string",
-                        "description": "Event description/details"
-                    },
-                    "category": {
-                        "type": "string",
-                        "enum": ["Lecture", "Lab", "Meeting", "Office Hours", "Assignment", "Defense", "Workshop", "Study Group", "Seminar", "Grading", "Advising"],
-                        "description": "Event category"
-                    },
-                    "level": {
-                        "type": "integer",
-                        "enum": [1, 2, 3],
-                        "description": "Priority level (1=Low, 2=Medium, 3=High)"
-                    },
-                    "status": {
-                        "type": "number",
-                        "minimum": 0.0,
-                        "maximum": 1.0,
-                        "description": "Completion status (0.0=Not Started, 0.5=In Progress, 1.0=Completed)"
-                    },
-                    "start_time": {
-                        "type": "string",
-                        "description": "Start time in YYYY-MM-DD HH:MM:SS format"
-                    },
-                    "end_time": {
-                        "type": "string",
-                        "description": "End time in YYYY-MM-DD HH:MM:SS format"
-                    }
-                },
-                "required": ["event_id"]
-            }
-        ),
-        types.Tool(
-            name="delete_event",
-            description="Delete an event from the calendar",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "event_id": {
-                        "type": "string",
-                        "description": "Event ID to delete"
-                    }
-                },
-                "required": ["event_id"]
-            }
-        ),
-        types.Tool(
-            name="get_upcoming_events",
-            description="Get upcoming events within a specified number of days",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "days": {
-                        "type": "integer",
-                        "minimum": 1,
-                        "maximum": 30,
-                        "description": "Number of days to look ahead (default: 7)"
-                    },
-                    "category": {
-                        "type": "string",
-                        "enum": ["Lecture", "Lab", "Meeting", "Office Hours", "Assignment", "Defense", "Workshop", "Study Group", "Seminar", "Grading", "Advising"],
-                        "description": "Filter by event category (optional)"
-                    }
-                }
-            }
-        ),
-        types.Tool(
-            name="get_events_by_date",
-            description="Get all events for a specific date",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "date": {
-                        "type": "string",
-                        "description": "Date in YYYY-MM-DD format"
-                    }
-                },
-                "required": ["date"]
-            }
-        ),
-        types.Tool(
-            name="search_events",
-            description="Search events by name or content",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "Search query to match against event names and descriptions"
-                    }
-                },
-                "required": ["query"]
-            }
-        ),
-        types.Tool(
-            name="get_calendar_statistics",
-            description="Get calendar statistics and overview",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "period": {
-                        "type": "string",
-                        "enum": ["week", "month", "semester"],
-                        "description": "Time period for statistics (default: month)"
-                    }
-                }
-            }
+        types.TextContent(
+            type="text",
+            text=f"{summary}\\n\\n{event_list}{more_results_hint(next_cursor)}"
         )
     ]
 
-@server.call_tool()
-async def handle_call_tool(
-    name: str, arguments: dict[str, Any] | None
-) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
-    """Handle calendar tool calls."""
+@tool_registry.tool(
+    "get_event",
+    "Get detailed information about a specific event by ID",
+    {
+        "event_id": {
+            "type": "string",
+            "description": "Event ID to retrieve"
+        }
+    },
+    required=["event_id"]
+)
+async def get_event(arguments: dict) -> list[types.TextContent]:
+    event_id = arguments["event_id"]
+    result = await make_calendar_api_request("GET", f"/schedules/{event_id}")
     
-    logger.info(f"🔧 Tool called: {name} with arguments: {arguments}")
+    # If result is a list (as the backend currently returns), take the first item
+    event = result[0] if isinstance(result, list) and result else result
     
-    try:
-        if name == "get_all_events":
-            result = await make_calendar_api_request("GET", "/schedules")
-            
-            events = result if isinstance(result, list) else []
-            
-            # Apply filters if provided
-            if arguments:
-                if "category" in arguments:
-                    events = [e for e in events if e.get("category") == arguments["category"]]
-                if "status" in arguments:
-                    status_map = {"not_started": 0.0, "in_progress": 0.5, "completed": 1.0}
-                    target_status = status_map.get(arguments["status"])
-                    if target_status is not None:
-                        if target_status == 0.0:
-                            events = [e for e in events if e.get("status", 0) == 0.0]
-                        elif target_status == 0.5:
-                            events = [e for e in events if 0.0 < e.get("status", 0) < 1.0]
-                        else:  # completed
-                            events = [e for e in events if e.get("status", 0) == 1.0]
-            
-            summary = f"Found {len(events)} events in Redwood Digital University calendar"
-            
-            event_list = "\\n".join([
-                f"• {event['name']} ({event['category']})\\n"
-                f"  📅 {event['start_time']} - {event['end_time']}\\n"
-                f"  📋 {event.get('content', 'No description')}\\n"
-                f"  🎯 Priority: {['', 'Low', 'Medium', 'High'][event.get('level', 1)]}\\n"
-                f"  ✅ Status: {int(event.get('status', 0) * 100)}% complete\\n"
-                for event in events[:10]  # Limit to first 10 for readability
-            ])
-            
-            if len(events) > 10:
-                event_list += f"\\n... and {len(events) - 10} more events"
-            
-            return [
-                types.TextContent(
-                    type="text",
-                    text=f"{summary}\\n\\n{event_list}"
-                )
-            ]
-        
-        elif name == "get_event":
-            if not arguments or "event_id" not in arguments:
-                raise ValueError("Event ID is required")
-            
-            event_id = arguments["event_id"]
-            result = await make_calendar_api_request("GET", f"/schedules/{event_id}")
-            
-            # If result is a list (as the backend currently returns), take the first item
-            event = result[0] if isinstance(result, list) and result else result
-            
-            details = f"""📚 Redwood Digital University Event Details:
+    details = f"""📚 Redwood Digital University Event Details:
 
 🎓 **{event['name']}**
 📋 **Category:** {event['category']}
@@ -333,223 +1123,363 @@ async def handle_call_tool(
 
 📅 **Schedule:**
 • Start: {event['start_time']}
-• End: {event['end_time']}
+• End: {event['end_time']}{format_recurrence(event)}
 
 🎯 **Priority:** {['', 'Low', 'Medium', 'High'][event.get('level', 1)]}
 ✅ **Status:** {int(event.get('status', 0) * 100)}% complete
 🆔 **Event ID:** {event['sid']}
 🕐 **Created:** {event.get('creation_time', 'Unknown')}"""
-            
-            return [
-                types.TextContent(
-                    type="text",
-                    text=details
-                )
-            ]
-        
-        elif name == "create_event":
-            if not arguments:
-                raise ValueError("Event details are required")
-            
-            required_fields = ["name", "category", "level", "start_time", "end_time"]
-            for field in required_fields:
-                if field not in arguments:
-                    raise ValueError(f"{field} is required")
-            
-            # Generate unique SID
-            timestamp = int(datetime.now().timestamp() * 1000)
-            sid = f"mcp-event-{timestamp}"
-            
-            # Prepare event data
-            event_data = {
-                "sid": sid,
-                "name": arguments["name"],
-                "content": arguments.get("content", ""),
-                "category": arguments["category"],
-                "level": arguments["level"],
-                "status": 0.0,  # New events start as not started
-                "creation_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "start_time": arguments["start_time"],
-                "end_time": arguments["end_time"]
-            }
-            
-            result = await make_calendar_api_request("POST", "/schedules", event_data)
-            
-            return [
-                types.TextContent(
-                    type="text",
-                    text=f"✅ Event created successfully!\\n\\n🎓 **{result['name']}**\\n📋 Category: {result['category']}\\n📅 Time: {result['start_time']} - {result['end_time']}\\n🆔 Event ID: {result['sid']}"
-                )
-            ]
-        
-        elif name == "update_event":
-            if not arguments or "event_id" not in arguments:
-                raise ValueError("Event ID is required")
-            
-            event_id = arguments["event_id"]
-            
-            # Get current event data first
-            current_event = await make_calendar_api_request("GET", f"/schedules/{event_id}")
-            if isinstance(current_event, list) and current_event:
-                current_event = current_event[0]
-            
-            # Prepare update data (merge with current data)
-            update_data = {
-                "sid": event_id,
-                "name": arguments.get("name", current_event["name"]),
-                "content": arguments.get("content", current_event.get("content", "")),
-                "category": arguments.get("category", current_event["category"]),
-                "level": arguments.get("level", current_event["level"]),
-                "status": arguments.get("status", current_event.get("status", 0.0)),
-                "creation_time": current_event.get("creation_time"),
-                "start_time": arguments.get("start_time", current_event["start_time"]),
-                "end_time": arguments.get("end_time", current_event["end_time"])
-            }
-            
-            result = await make_calendar_api_request("PUT", f"/schedules/{event_id}", update_data)
-            
-            return [
-                types.TextContent(
-                    type="text",
-                    text=f"✅ Event updated successfully!\\n\\n🎓 **{result['name']}**\\n📋 Category: {result['category']}\\n✅ Status: {int(result.get('status', 0) * 100)}% complete"
-                )
-            ]
-        
-        elif name == "delete_event":
-            if not arguments or "event_id" not in arguments:
-                raise ValueError("Event ID is required")
-            
-            event_id = arguments["event_id"]
-            result = await make_calendar_api_request("DELETE", f"/schedules/{event_id}")
-            
-            return [
-                types.TextContent(
-                    type="text",
-                    text=f"🗑️ Event deleted successfully: {event_id}"
-                )
-            ]
-        
-        elif name == "get_upcoming_events":
-            days = arguments.get("days", 7) if arguments else 7
-            category_filter = arguments.get("category") if arguments else None
-            
-            # Get all events and filter for upcoming ones
-            all_events = await make_calendar_api_request("GET", "/schedules")
-            
-            now = datetime.now()
-            future_date = now + timedelta(days=days)
-            
-            upcoming_events = []
-            for event in all_events:
-                try:
-                    event_start = datetime.strptime(event["start_time"], "%Y-%m-%d %H:%M:%S")
-                    if now <= event_start <= future_date:
-                        if not category_filter or event.get("category") == category_filter:
-                            upcoming_events.append(event)
-                except:
-                    continue  # Skip events with invalid dates
-            
-            # Sort by start time
-            upcoming_events.sort(key=lambda x: x["start_time"])
-            
-            summary = f"📅 Upcoming events in next {days} day{'s' if days != 1 else ''}"
-            if category_filter:
-                summary += f" (filtered by {category_filter})"
-            summary += f": {len(upcoming_events)} found"
-            
-            event_list = "\\n".join([
-                f"• {event['name']} ({event['category']})\\n  📅 {event['start_time']}"
-                for event in upcoming_events[:10]
-            ])
-            
-            return [
-                types.TextContent(
-                    type="text",
-                    text=f"{summary}\\n\\n{event_list}"
-                )
-            ]
-        
-        elif name == "get_events_by_date":
-            if not arguments or "date" not in arguments:
-                raise ValueError("Date is required (YYYY-MM-DD format)")
-            
-            target_date = arguments["date"]
-            all_events = await make_calendar_api_request("GET", "/schedules")
-            
-            date_events = []
-            for event in all_events:
-                try:
-                    event_date = event["start_time"].split()[0]  # Extract date part
-                    if event_date == target_date:
-                        date_events.append(event)
-                except:
-                    continue
-            
-            summary = f"📅 Events on {target_date}: {len(date_events)} found"
-            
-            event_list = "\\n".join([
-                f"• {event['name']} ({event['category']})\\n  🕐 {event['start_time'].split()[1]} - {event['end_time'].split()[1]}"
-                for event in date_events
-            ])
-            
-            return [
-                types.TextContent(
-                    type="text",
-                    text=f"{summary}\\n\\n{event_list if event_list else 'No events scheduled for this date.'}"
-                )
-            ]
-        
-        elif name == "search_events":
-            if not arguments or "query" not in arguments:
-                raise ValueError("Search query is required")
-            
-            query = arguments["query"].lower()
-            all_events = await make_calendar_api_request("GET", "/schedules")
-            
-            matching_events = []
-            for event in all_events:
-                if (query in event["name"].lower() or 
-                    query in event.get("content", "").lower()):
-                    matching_events.append(event)
-            
-            summary = f"🔍 Search results for '{arguments['query']}': {len(matching_events)} events found"
-            
-            event_list = "\\n".join([
-                f"• {event['name']} ({event['category']})\\n  📅 {event['start_time']}"
-                for event in matching_events[:10]
-            ])
-            
-            return [
-                types.TextContent(
-                    type="text",
-                    text=f"{summary}\\n\\n{event_list if event_list else 'No events match your search query.'}"
-                )
-            ]
-        
-        elif name == "get_calendar_statistics":
-            period = arguments.get("period", "month") if arguments else "month"
-            all_events = await make_calendar_api_request("GET", "/schedules")
-            
-            # Calculate statistics
-            total_events = len(all_events)
-            completed_events = len([e for e in all_events if e.get("status", 0) == 1.0])
-            in_progress_events = len([e for e in all_events if 0 < e.get("status", 0) < 1.0])
-            pending_events = len([e for e in all_events if e.get("status", 0) == 0.0])
-            
-            # Category breakdown
-            categories = {}
-            for event in all_events:
-                cat = event.get("category", "Unknown")
-                categories[cat] = categories.get(cat, 0) + 1
-            
-            category_breakdown = "\\n".join([
-                f"• {cat}: {count} events" 
-                for cat, count in sorted(categories.items())
-            ])
-            
-            completion_rate = (completed_events / total_events * 100) if total_events > 0 else 0
-            
-            stats = f"""📊 Redwood Digital University Calendar Statistics ({period})
+    
+    return [
+        types.TextContent(
+            type="text",
+            text=details
+        )
+    ]
+
+@tool_registry.tool(
+    "create_event",
+    "Create a new academic event in the calendar",
+    {
+        **EVENT_PROPERTIES,
+        "on_conflict": {
+            "type": "string",
+            "enum": ["ignore", "warn", "refuse"],
+            "description": "If the event overlaps existing ones: create it anyway (ignore, default), create it and list the overlaps (warn), or don't create it (refuse). For a repeating event only the first occurrence is checked"
+        }
+    },
+    required=CREATE_EVENT_REQUIRED
+)
+async def create_event(arguments: dict) -> list[types.TextContent]:
+    # One indexed lookup of the new slot, not a scan of the calendar
+    on_conflict = arguments.get("on_conflict", "ignore")
+    conflicts = []
+    if on_conflict != "ignore":
+        conflicts = await find_conflicts_with(arguments["start_time"], arguments["end_time"])
+        if conflicts and on_conflict == "refuse":
+            raise ValueError(f"Not created: {arguments['name']} overlaps {len(conflicts)} event(s)\\n{format_conflicts(conflicts)}")
+    
+    # Generate unique SID
+    timestamp = int(datetime.now().timestamp() * 1000)
+    event_data = new_event(arguments, f"mcp-event-{timestamp}")
+    
+    result = await make_calendar_api_request("POST", "/schedules", event_data)
+    warning = f"\\n\\n⚠️ Overlaps {len(conflicts)} event(s):\\n{format_conflicts(conflicts)}" if conflicts else ""
+    repeats = f"\\n🔁 Repeats: {result['rrule']}" if result.get("rrule") else ""
+    
+    return [
+        types.TextContent(
+            type="text",
+            text=f"✅ Event created successfully!\\n\\n🎓 **{result['name']}**\\n📋 Category: {result['category']}\\n📅 Time: {result['start_time']} - {result['end_time']}{repeats}\\n🆔 Event ID: {result['sid']}{warning}"
+        )
+    ]
+
+@tool_registry.tool(
+    "update_event",
+    "Update an existing event in the calendar. Updating a repeating event changes the whole series; updating one occurrence (<event_id>@<YYYYMMDDTHHMMSS>) moves it out of the series as a separate event",
+    UPDATE_EVENT_PROPERTIES,
+    required=["event_id"]
+)
+async def update_event(arguments: dict) -> list[types.TextContent]:
+    event_id = arguments["event_id"]
+    
+    # Send only the changed fields; the API merges them in one statement and
+    # returns the merged event, so there is no read-modify-write to race with
+    changes = {field: arguments[field] for field in UPDATE_EVENT_PROPERTIES if field != "event_id" and field in arguments}
+    error = validate_event(changes, [])
+    if error:
+        raise ValueError(error)
+    
+    result = await make_calendar_api_request("PATCH", f"/schedules/{event_id}", changes)
+    
+    return [
+        types.TextContent(
+            type="text",
+            text=f"✅ Event updated successfully!\\n\\n🎓 **{result['name']}**\\n📋 Category: {result['category']}\\n✅ Status: {int(result.get('status', 0) * 100)}% complete"
+        )
+    ]
+
+@tool_registry.tool(
+    "create_events",
+    "Create many academic events at once (e.g. every lecture of a semester)",
+    batch_properties(CREATE_EVENT_SCHEMA, "Events to create, each with the same fields as create_event"),
+    required=["events"],
+    validate=BATCH_ARGUMENTS_SCHEMA,
+    item_schema=CREATE_EVENT_SCHEMA
+)
+async def create_events(arguments: dict) -> list[types.TextContent]:
+    # Validate everything up front; only valid events are sent
+    timestamp = int(datetime.now().timestamp() * 1000)
+    rows, batch = [], []
+    for i, item in enumerate(arguments["events"]):
+        sid = f"mcp-event-{timestamp}-{i}"
+        error = tool_registry.item_error("create_events", item) or validate_event(item, CREATE_EVENT_REQUIRED)
+        if error is None:
+            batch.append(new_event(item, sid))
+        rows.append([sid, item.get("name", "?"), error])
+    
+    errors = await send_bulk("POST", batch) if batch else {}
+    for row in rows:
+        if row[2] is None:
+            row[2] = errors.get(row[0], "not written")
+    
+    return [
+        types.TextContent(
+            type="text",
+            text=format_batch_results("Created", rows)
+        )
+    ]
+
+@tool_registry.tool(
+    "update_events",
+    "Update many existing events at once",
+    batch_properties(UPDATE_EVENT_SCHEMA, "Updates to apply, each with an event_id and the fields to change, as for update_event"),
+    required=["events"],
+    validate=BATCH_ARGUMENTS_SCHEMA,
+    item_schema=UPDATE_EVENT_SCHEMA
+)
+async def update_events(arguments: dict) -> list[types.TextContent]:
+    items = arguments["events"]
+    rows = [[item.get("event_id", "?"), item.get("name", "?"),
+             tool_registry.item_error("update_events", item) or validate_event(item, ["event_id"])] for item in items]
+    
+    # Each update is a PATCH, as in update_event: the API merges only the given
+    # fields, and occurrences of repeating events are detached from their series
+    valid = [i for i, row in enumerate(rows) if row[2] is None]
+    results = await gather_bounded(
+        make_calendar_api_request("PATCH", f"/schedules/{items[i]['event_id']}",
+                                  {field: items[i][field] for field in UPDATE_EVENT_PROPERTIES
+                                   if field != "event_id" and field in items[i]})
+        for i in valid
+    )
+    for i, result in zip(valid, results):
+        if isinstance(result, CalendarAPIError) and result.status == 404:
+            rows[i][2] = "Schedule not found"
+        elif isinstance(result, Exception):
+            rows[i][2] = str(result)
+        else:
+            rows[i][1] = result["name"]
+    
+    return [
+        types.TextContent(
+            type="text",
+            text=format_batch_results("Updated", rows)
+        )
+    ]
+
+@tool_registry.tool(
+    "delete_event",
+    "Delete an event from the calendar. Deleting a repeating event removes the whole series; deleting one occurrence (<event_id>@<YYYYMMDDTHHMMSS>) cancels just that one",
+    {
+        "event_id": {
+            "type": "string",
+            "description": "Event ID to delete"
+        }
+    },
+    required=["event_id"]
+)
+async def delete_event(arguments: dict) -> list[types.TextContent]:
+    event_id = arguments["event_id"]
+    result = await make_calendar_api_request("DELETE", f"/schedules/{event_id}")
+    
+    return [
+        types.TextContent(
+            type="text",
+            text=f"🗑️ Event deleted successfully: {event_id}"
+        )
+    ]
+
+@tool_registry.tool(
+    "get_upcoming_events",
+    "Get upcoming events within a specified number of days",
+    {
+        "days": {
+            "type": "integer",
+            "minimum": 1,
+            "maximum": 30,
+            "description": "Number of days to look ahead (default: 7)"
+        },
+        "category": CATEGORY_FILTER_PROPERTY,
+        **PAGE_PROPERTIES
+    }
+)
+async def get_upcoming_events(arguments: dict) -> list[types.TextContent]:
+    days = arguments.get("days", 7)
+    category_filter = arguments.get("category")
+    output_format, fields, limit = get_page_options(arguments)
+    
+    now = datetime.now()
+    future_date = now + timedelta(days=days)
+    
+    # Fetch whole days so the window (and its cached index) stays the same
+    # across calls, then cut the exact look-ahead slice out of the index
+    today = datetime(now.year, now.month, now.day)
+    index = await get_event_index("/schedules", params={
+        "from": today.strftime("%Y-%m-%d"),
+        "to": (future_date + timedelta(days=1)).strftime("%Y-%m-%d")
+    })
+    
+    # Walk the index from the cursor and stop after one page, so the
+    # cost follows the page size rather than the window
+    after = decode_cursor(arguments["cursor"]) if arguments.get("cursor") else None
+    if after is not None and not (isinstance(after, list) and len(after) == 2):
+        raise ValueError("Invalid cursor")
+    upcoming_events, next_cursor = [], None
+    with timed_phase("index"):
+        for event in index.iter_starting(now, future_date + timedelta(seconds=1), after):
+            if category_filter and event.get("category") != category_filter:
+                continue
+            if len(upcoming_events) == limit:
+                last = upcoming_events[-1]
+                next_cursor = encode_cursor([last["start_time"], last["sid"]])
+                break
+            upcoming_events.append(event)
+    
+    if output_format == "json":
+        return json_page(upcoming_events, fields, next_cursor)
+    
+    summary = f"📅 Upcoming events in next {days} day{'s' if days != 1 else ''}"
+    if category_filter:
+        summary += f" (filtered by {category_filter})"
+    summary += f": {len(upcoming_events)}{'+' if next_cursor else ''} found"
+    
+    event_list = "\\n".join([
+        f"• {event['name']} ({event['category']})\\n  📅 {event['start_time']}"
+        for event in upcoming_events
+    ])
+    
+    return [
+        types.TextContent(
+            type="text",
+            text=f"{summary}\\n\\n{event_list}{more_results_hint(next_cursor)}"
+        )
+    ]
+
+@tool_registry.tool(
+    "get_events_by_date",
+    "Get all events for a specific date",
+    {
+        "date": {
+            "type": "string",
+            "description": "Date in YYYY-MM-DD format"
+        }
+    },
+    required=["date"]
+)
+async def get_events_by_date(arguments: dict) -> list[types.TextContent]:
+    target_date = arguments["date"]
+    try:
+        day_start = datetime.strptime(target_date, "%Y-%m-%d")
+    except ValueError:
+        raise ValueError("Date is required (YYYY-MM-DD format)")
+    
+    # Only fetch events overlapping that day; keep the ones starting on it
+    day_end = day_start + timedelta(days=1)
+    index = await get_event_index("/schedules", params={
+        "from": day_start.strftime("%Y-%m-%d"),
+        "to": day_end.strftime("%Y-%m-%d")
+    })
+    with timed_phase("index"):
+        date_events = index.starting(day_start, day_end)
+    
+    summary = f"📅 Events on {target_date}: {len(date_events)} found"
+    
+    event_list = "\\n".join([
+        f"• {event['name']} ({event['category']})\\n  🕐 {event['start_time'].split()[1]} - {event['end_time'].split()[1]}"
+        for event in date_events
+    ])
+    
+    return [
+        types.TextContent(
+            type="text",
+            text=f"{summary}\\n\\n{event_list if event_list else 'No events scheduled for this date.'}"
+        )
+    ]
+
+@tool_registry.tool(
+    "search_events",
+    "Search events by name or content",
+    {
+        "query": {
+            "type": "string",
+            "description": "Search query to match against event names and descriptions"
+        },
+        **PAGE_PROPERTIES
+    },
+    required=["query"]
+)
+async def search_events(arguments: dict) -> list[types.TextContent]:
+    output_format, fields, limit = get_page_options(arguments)
+    offset = decode_cursor(arguments["cursor"]) if arguments.get("cursor") else 0
+    if not isinstance(offset, int) or offset < 0:
+        raise ValueError("Invalid cursor")
+    
+    # Ranked full-text search runs on the API's FTS index; one extra row
+    # tells whether another page follows
+    matching_events = await make_calendar_api_request("GET", "/schedules/search", params={
+        "q": arguments["query"],
+        "limit": limit + 1,
+        "offset": offset
+    })
+    next_cursor = encode_cursor(offset + limit) if len(matching_events) > limit else None
+    matching_events = matching_events[:limit]
+    
+    if output_format == "json":
+        return json_page(matching_events, fields, next_cursor)
+    
+    summary = f"🔍 Search results for '{arguments['query']}': {len(matching_events)}{'+' if next_cursor else ''} events found"
+    
+    event_list = "\\n".join([
+        f"• {event['name']} ({event['category']})\\n  📅 {event['start_time']}"
+        for event in matching_events
+    ])
+    
+    return [
+        types.TextContent(
+            type="text",
+            text=f"{summary}\\n\\n{event_list if event_list else 'No events match your search query.'}{more_results_hint(next_cursor)}"
+        )
+    ]
+
+@tool_registry.tool(
+    "get_calendar_statistics",
+    "Get calendar statistics and overview",
+    {
+        "period": {
+            "type": "string",
+            "enum": ["week", "month", "semester"],
+            "description": "Time period for statistics: the current week (Mon-Sun), calendar month or semester (Jan-Jun / Jul-Dec) (default: month)"
+        }
+    }
+)
+async def get_calendar_statistics(arguments: dict) -> list[types.TextContent]:
+    period = arguments.get("period", "month")
+    period_start, period_end = get_period_window(period, datetime.now())
+    
+    # Counts are aggregated by the API over the period's window
+    result = await make_calendar_api_request("GET", "/schedules/stats", params={
+        "from": period_start.strftime("%Y-%m-%d"),
+        "to": period_end.strftime("%Y-%m-%d")
+    })
+    
+    total_events = result["total"]
+    completed_events = result["status"]["completed"]
+    in_progress_events = result["status"]["in_progress"]
+    pending_events = result["status"]["not_started"]
+    
+    category_breakdown = "\\n".join([
+        f"• {cat}: {count} events" 
+        for cat, count in sorted(result["category"].items())
+    ])
+    
+    priority_breakdown = "\\n".join([
+        f"• {({'1': 'Low', '2': 'Medium', '3': 'High'}).get(level, level)}: {count} events"
+        for level, count in sorted(result["level"].items())
+    ])
+    
+    completion_rate = (completed_events / total_events * 100) if total_events > 0 else 0
+    
+    stats = f"""📊 Redwood Digital University Calendar Statistics ({period}: {period_start.strftime("%Y-%m-%d")} to {(period_end - timedelta(days=1)).strftime("%Y-%m-%d")})
 
 📈 **Overview:**
 • Total Events: {total_events}
@@ -560,19 +1490,205 @@ async def handle_call_tool(
 📋 **By Category:**
 {category_breakdown}
 
+⚡ **By Priority:**
+{priority_breakdown}
+
 🎯 **Academic Activity Level:** {'High' if total_events > 50 else 'Medium' if total_events > 20 else 'Low'}"""
-            
-            return [
-                types.TextContent(
-                    type="text",
-                    text=stats
-                )
-            ]
+    
+    return [
+        types.TextContent(
+            type="text",
+            text=stats
+        )
+    ]
+
+@tool_registry.tool(
+    "find_conflicts",
+    "Find overlapping events: check one candidate time slot, or list every clashing pair in a date range",
+    {
+        "start_time": {
+            "type": "string",
+            "description": "Start of a candidate slot in YYYY-MM-DD HH:MM:SS format; with end_time, checks just that slot"
+        },
+        "end_time": {
+            "type": "string",
+            "description": "End of the candidate slot in YYYY-MM-DD HH:MM:SS format"
+        },
+        "exclude_event_id": {
+            "type": "string",
+            "description": "Event to leave out when checking a slot, e.g. the one being moved"
+        },
+        "from": {
+            "type": "string",
+            "description": "Start of the date range to scan for clashing pairs, YYYY-MM-DD (default: today)"
+        },
+        "to": {
+            "type": "string",
+            "description": "End of the date range (exclusive), YYYY-MM-DD (default: 7 days after from)"
+        },
+        "limit": {
+            "type": "integer",
+            "minimum": 1,
+            "maximum": MAX_PAGE_SIZE,
+            "description": "Maximum pairs to list (default: 20); the total is always reported"
+        }
+    }
+)
+async def find_conflicts(arguments: dict) -> list[types.TextContent]:
+    if "start_time" in arguments or "end_time" in arguments:
+        error = validate_event(arguments, ["start_time", "end_time"])
+        if error:
+            raise ValueError(error)
+        conflicts = await find_conflicts_with(arguments["start_time"], arguments["end_time"], arguments.get("exclude_event_id"))
+        summary = f"{'⚠️' if conflicts else '✅'} {arguments['start_time']} - {arguments['end_time']}: {len(conflicts)} conflicting events"
         
-        else:
-            raise ValueError(f"Unknown tool: {name}")
+        return [
+            types.TextContent(
+                type="text",
+                text=f"{summary}\\n\\n{format_conflicts(conflicts) if conflicts else 'The slot is free.'}"
+            )
+        ]
+    
+    try:
+        today = datetime.combine(datetime.now().date(), datetime.min.time())
+        range_start = datetime.strptime(arguments["from"], "%Y-%m-%d") if "from" in arguments else today
+        range_end = datetime.strptime(arguments["to"], "%Y-%m-%d") if "to" in arguments else range_start + timedelta(days=7)
+    except ValueError:
+        raise ValueError("from and to must be in YYYY-MM-DD format")
+    
+    # The API sweeps the range once in start order instead of comparing every
+    # pair of events
+    result = await make_calendar_api_request("GET", "/schedules/conflicts", params={
+        "from": range_start.strftime("%Y-%m-%d"),
+        "to": range_end.strftime("%Y-%m-%d"),
+        "limit": arguments.get("limit", 20)
+    })
+    
+    summary = f"⚔️ Overlapping events from {range_start.strftime('%Y-%m-%d')} to {range_end.strftime('%Y-%m-%d')}: {result['total']} pairs"
+    if result["total"] > len(result["conflicts"]):
+        summary += f" (showing {len(result['conflicts'])})"
+    
+    pair_list = "\\n".join([
+        f"• {pair['a']['name']} ({pair['a']['sid']}) ↔ {pair['b']['name']} ({pair['b']['sid']})\\n"
+        f"  🕐 Overlap: {pair['overlap_start']} - {pair['overlap_end']}"
+        for pair in result["conflicts"]
+    ])
+    
+    return [
+        types.TextContent(
+            type="text",
+            text=f"{summary}\\n\\n{pair_list if pair_list else 'No overlapping events.'}"
+        )
+    ]
+
+@tool_registry.tool(
+    "find_free_slots",
+    "Find free time slots of at least a given length, e.g. a free 90-minute slot between 9 and 17 next week",
+    {
+        "duration_minutes": {
+            "type": "integer",
+            "minimum": 1,
+            "maximum": 1440,
+            "description": "Minimum length of a free slot in minutes (default: 60)"
+        },
+        "from": {
+            "type": "string",
+            "description": "First day to search, YYYY-MM-DD (default: today)"
+        },
+        "to": {
+            "type": "string",
+            "description": "Day after the last day to search, YYYY-MM-DD (default: 7 days after from)"
+        },
+        "day_start": {
+            "type": "string",
+            "pattern": "^\\d{2}:\\d{2}$",
+            "description": "Start of working hours, HH:MM (default: 09:00)"
+        },
+        "day_end": {
+            "type": "string",
+            "pattern": "^\\d{2}:\\d{2}$",
+            "description": "End of working hours, HH:MM (default: 17:00)"
+        },
+        "weekdays_only": {
+            "type": "boolean",
+            "description": "Skip Saturdays and Sundays (default: true)"
+        },
+        "limit": {
+            "type": "integer",
+            "minimum": 1,
+            "maximum": MAX_PAGE_SIZE,
+            "description": f"Maximum slots to list (default: {DEFAULT_PAGE_SIZE})"
+        }
+    }
+)
+async def find_free_slots(arguments: dict) -> list[types.TextContent]:
+    duration = arguments.get("duration_minutes", 60)
+    try:
+        today = datetime.combine(datetime.now().date(), datetime.min.time())
+        range_start = datetime.strptime(arguments["from"], "%Y-%m-%d") if "from" in arguments else today
+        range_end = datetime.strptime(arguments["to"], "%Y-%m-%d") if "to" in arguments else range_start + timedelta(days=7)
+    except ValueError:
+        raise ValueError("from and to must be in YYYY-MM-DD format")
+    # Slots in the past are no use; start searching from now
+    range_start = max(range_start, datetime.now().replace(second=0, microsecond=0))
+    day_start, day_end = arguments.get("day_start", "09:00"), arguments.get("day_end", "17:00")
+    if day_start >= day_end:
+        raise ValueError("day_start must be before day_end")
+    
+    # The API merges the busy intervals and cuts the gaps to working hours
+    result = await make_calendar_api_request("GET", "/schedules/free", params={
+        "from": range_start.strftime("%Y-%m-%d %H:%M:%S"),
+        "to": range_end.strftime("%Y-%m-%d %H:%M:%S"),
+        "min_minutes": duration,
+        "day_start": day_start,
+        "day_end": day_end,
+        "weekdays_only": "true" if arguments.get("weekdays_only", True) else "false",
+        "limit": arguments.get("limit", DEFAULT_PAGE_SIZE)
+    })
+    
+    summary = (f"🟢 Free slots of {duration}+ minutes between {day_start} and {day_end}, "
+               f"{range_start.strftime('%Y-%m-%d')} to {(range_end - timedelta(days=1)).strftime('%Y-%m-%d')}: "
+               f"{len(result['free'])} found ({result['busy_total']} busy blocks)")
+    
+    # Slots only run past midnight when the working hours do
+    slot_list = "\\n".join([
+        f"• {datetime.strptime(slot['start'], '%Y-%m-%d %H:%M:%S').strftime('%a %Y-%m-%d %H:%M')} - "
+        f"{slot['end'][11:16] if slot['end'][:10] == slot['start'][:10] else slot['end'][:16]} ({slot['minutes']} min)"
+        for slot in result["free"]
+    ])
+    
+    return [
+        types.TextContent(
+            type="text",
+            text=f"{summary}\\n\\n{slot_list if slot_list else 'No free slot is long enough.'}"
+        )
+    ]
+
+@server.list_tools()
+async def handle_list_tools() -> list[types.Tool]:
+    """List available calendar tools."""
+    return tool_registry.tools
+
+# Arguments are validated by the registry's precompiled validators instead
+@server.call_tool(validate_input=False)
+async def handle_call_tool(
+    name: str, arguments: dict[str, Any] | None
+) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
+    """Handle calendar tool calls."""
+    
+    logger.info(f"🔧 Tool called: {name} with arguments: {arguments}")
+    
+    # Phases are filled in by the API helpers and timed_phase(); whatever is
+    # left over (validation, rendering) is reported as "other"
+    phases = {}
+    token = current_phases.set(phases)
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        return await tool_registry.call(name, arguments or {})
     
     except Exception as e:
+        status = "error"
         logger.error(f"Tool execution failed: {e}")
         return [
             types.TextContent(
@@ -580,35 +1696,127 @@ async def handle_call_tool(
                 text=f"❌ Error: {str(e)}"
             )
         ]
+    finally:
+        current_phases.reset(token)
+        metrics.observe_tool(name, status, time.perf_counter() - started, phases)
 
-async def main():
+def initialization_options() -> InitializationOptions:
+    return InitializationOptions(
+        server_name="calendar-mcp-server",
+        server_version="1.0.0",
+        capabilities=server.get_capabilities(
+            notification_options=NotificationOptions(),
+            experimental_capabilities={},
+        ),
+    )
+
+@contextlib.asynccontextmanager
+async def server_lifecycle():
+    """Open the shared API connection pool and check the API once for the whole process."""
     logger.info("🎓 Starting Redwood Digital University Calendar MCP Server")
     logger.info(f"📡 Calendar API URL: {CALENDAR_API_BASE_URL}")
     
-    # Test API connection
+    # One keep-alive connection pool for the lifetime of the server
+    await open_http_session()
     try:
-        test_result = await make_calendar_api_request("GET", "/")
-        logger.info(f"✅ Calendar API connection successful: {test_result}")
-    except Exception as e:
-        logger.error(f"❌ Calendar API connection failed: {e}")
-        logger.error("🔧 Make sure the calendar API is running on the configured URL")
-    
-    logger.info("🔄 MCP Server ready - waiting for JSON-RPC connections...")
-    
-    # Run the server using stdio
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="calendar-mcp-server",
-                server_version="1.0.0",
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
-                ),
-            ),
-        )
+        # Test API connection
+        try:
+            test_result = await make_calendar_api_request("GET", "/")
+            logger.info(f"✅ Calendar API connection successful: {test_result}")
+        except Exception as e:
+            logger.error(f"❌ Calendar API connection failed: {e}")
+            logger.error("🔧 Make sure the calendar API is running on the configured URL")
+        if MCP_METRICS_INTERVAL > 0:
+            metrics_task = asyncio.create_task(log_metrics_periodically(MCP_METRICS_INTERVAL))
+        if CALENDAR_CHANGE_FEED:
+            change_feed_task = asyncio.create_task(follow_change_feed())
+        if profiler:
+            profiler.start()
+        yield
+    finally:
+        if MCP_METRICS_INTERVAL > 0:
+            metrics_task.cancel()
+            for line in metrics.summary():
+                logger.info(line)
+        if CALENDAR_CHANGE_FEED:
+            change_feed_task.cancel()
+        if profiler:
+            profiler.stop()
+            profiler.write(MCP_PROFILE_OUTPUT)
+        await close_http_session()
+
+class StreamableHTTPEndpoint:
+    """ASGI endpoint handing every request on /mcp to the session manager."""
+    
+    def __init__(self, session_manager):
+        self.session_manager = session_manager
+    
+    async def __call__(self, scope, receive, send):
+        await self.session_manager.handle_request(scope, receive, send)
+
+def create_http_app(transport: str):
+    """Serve many MCP sessions from one process over streamable HTTP or SSE."""
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse, Response
+    from starlette.routing import Mount, Route
+    
+    async def health(request):
+        return JSONResponse({"status": "ok", "transport": transport})
+    
+    async def prometheus_metrics(request):
+        return Response(metrics.render(), media_type="text/plain; version=0.0.4")
+    
+    async def profile(request):
+        if profiler is None:
+            return Response("Sampling profiler is off; set MCP_PROFILE_INTERVAL\n", status_code=404, media_type="text/plain")
+        return Response(profiler.folded(), media_type="text/plain")
+    
+    if transport == "streamable-http":
+        from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+        session_manager = StreamableHTTPSessionManager(app=server, json_response=MCP_JSON_RESPONSE)
+        routes = [Route("/mcp", endpoint=StreamableHTTPEndpoint(session_manager))]
+        
+        @contextlib.asynccontextmanager
+        async def lifespan(app):
+            async with server_lifecycle(), session_manager.run():
+                logger.info(f"🔄 MCP Server ready - streamable HTTP on http://{MCP_HOST}:{MCP_PORT}/mcp")
+                yield
+    else:
+        from mcp.server.sse import SseServerTransport
+        sse = SseServerTransport("/messages/")
+        
+        async def handle_sse(request):
+            async with sse.connect_sse(request.scope, request.receive, request._send) as (read_stream, write_stream):
+                await server.run(read_stream, write_stream, initialization_options())
+            return Response()
+        
+        routes = [Route("/sse", endpoint=handle_sse), Mount("/messages/", app=sse.handle_post_message)]
+        
+        @contextlib.asynccontextmanager
+        async def lifespan(app):
+            async with server_lifecycle():
+                logger.info(f"🔄 MCP Server ready - SSE on http://{MCP_HOST}:{MCP_PORT}/sse")
+                yield
+    
+    routes += [Route("/health", endpoint=health), Route("/metrics", endpoint=prometheus_metrics),
+               Route("/debug/profile", endpoint=profile)]
+    return Starlette(routes=routes, lifespan=lifespan)
+
+async def main():
+    if MCP_TRANSPORT in ("streamable-http", "sse"):
+        import uvicorn
+        config = uvicorn.Config(create_http_app(MCP_TRANSPORT), host=MCP_HOST, port=MCP_PORT, log_level="warning")
+        await uvicorn.Server(config).serve()
+        return
+    if MCP_TRANSPORT != "stdio":
+        raise ValueError(f"Unknown MCP_TRANSPORT: {MCP_TRANSPORT} (expected stdio, streamable-http or sse)")
+    
+    async with server_lifecycle():
+        logger.info("🔄 MCP Server ready - waiting for JSON-RPC connections...")
+        
+        # Run the server using stdio
+        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+            await server.run(read_stream, write_stream, initialization_options())
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
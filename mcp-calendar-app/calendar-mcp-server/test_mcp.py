@@ -82,6 +82,96 @@ async def test_create_event():
         print(f"❌ create_event failed: {e}")
         return False
 
+async def test_recurring_event():
+    """Test a repeating event: expanded by date, one occurrence cancelled, series deleted"""
+    print("\n🔁 Testing recurring events...")
+    try:
+        result = await handle_call_tool("create_event", {
+            "name": "MCP Weekly Seminar",
+            "category": "Seminar",
+            "level": 2,
+            "start_time": "2025-07-07 10:00:00",
+            "end_time": "2025-07-07 11:00:00",
+            "rrule": "FREQ=WEEKLY;COUNT=3"
+        })
+        event_id = result[0].text.split("Event ID: ")[1].split("\\n")[0].split()[0]
+        week_two = await handle_call_tool("get_events_by_date", {"date": "2025-07-14"})
+        await handle_call_tool("delete_event", {"event_id": f"{event_id}@20250714T100000"})
+        cancelled = await handle_call_tool("get_events_by_date", {"date": "2025-07-14"})
+        week_three = await handle_call_tool("get_events_by_date", {"date": "2025-07-21"})
+        await handle_call_tool("delete_event", {"event_id": event_id})
+        ok = ("MCP Weekly Seminar" in week_two[0].text and "MCP Weekly Seminar" not in cancelled[0].text
+              and "MCP Weekly Seminar" in week_three[0].text)
+        print(f"{'✅' if ok else '❌'} recurring event {event_id}: {week_three[0].text[:200]}")
+        return ok
+    except Exception as e:
+        print(f"❌ recurring events failed: {e}")
+        return False
+
+async def test_update_events():
+    """Test update_events: a plain event and one occurrence of a repeating event, patched in one call"""
+    print("\n✏️ Testing update_events tool...")
+    try:
+        created = await handle_call_tool("create_event", {
+            "name": "MCP Batch Seminar",
+            "category": "Seminar",
+            "level": 2,
+            "start_time": "2025-08-04 10:00:00",
+            "end_time": "2025-08-04 11:00:00",
+            "rrule": "FREQ=WEEKLY;COUNT=3"
+        })
+        series_id = created[0].text.split("Event ID: ")[1].split("\\n")[0].split()[0]
+        created = await handle_call_tool("create_event", {
+            "name": "MCP Batch Meeting",
+            "category": "Meeting",
+            "level": 1,
+            "start_time": "2025-08-05 14:00:00",
+            "end_time": "2025-08-05 15:00:00"
+        })
+        event_id = created[0].text.split("Event ID: ")[1].split("\\n")[0].split()[0]
+        result = await handle_call_tool("update_events", {"events": [
+            {"event_id": event_id, "status": 0.5},
+            {"event_id": f"{series_id}@20250811T100000", "name": "MCP Batch Seminar (moved)",
+             "start_time": "2025-08-12 10:00:00", "end_time": "2025-08-12 11:00:00"},
+            {"event_id": "no-such-event", "status": 1.0}
+        ]})
+        moved = await handle_call_tool("get_events_by_date", {"date": "2025-08-12"})
+        for sid in [series_id, f"{series_id}@20250811T100000", event_id]:
+            await handle_call_tool("delete_event", {"event_id": sid})
+        text = result[0].text
+        ok = "Updated 2 of 3" in text and "Schedule not found" in text and "MCP Batch Seminar (moved)" in moved[0].text
+        print(f"{'✅' if ok else '❌'} update_events result:")
+        print(text)
+        return ok
+    except Exception as e:
+        print(f"❌ update_events failed: {e}")
+        return False
+
+async def test_batch_validation():
+    """Test that a malformed batch item fails on its own while the valid ones are written"""
+    print("\n🧾 Testing per-item validation in create_events / update_events...")
+    try:
+        good = {"name": "MCP Valid Batch Item", "category": "Meeting", "level": 1,
+                "start_time": "2025-09-01 09:00:00", "end_time": "2025-09-01 10:00:00"}
+        created = await handle_call_tool("create_events", {"events": [
+            good, {**good, "name": 5}, {**good, "name": "MCP Bad Rule", "rrule": 7}
+        ]})
+        text = created[0].text
+        event_id = text.split("MCP Valid Batch Item (")[1].split(")")[0]
+        updated = await handle_call_tool("update_events", {"events": [
+            {"event_id": event_id, "status": 0.5}, {"event_id": event_id, "level": "high"}
+        ]})
+        await handle_call_tool("delete_event", {"event_id": event_id})
+        ok = ("Created 1 of 3" in text and "5 is not of type 'string'" in text and "7 is not of type 'string'" in text
+              and "Updated 1 of 2" in updated[0].text)
+        print(f"{'✅' if ok else '❌'} batch validation results:")
+        print(text)
+        print(updated[0].text)
+        return ok
+    except Exception as e:
+        print(f"❌ batch validation failed: {e}")
+        return False
+
 async def test_search_events():
     """Test search_events tool"""
     print("\n🔍 Testing search_events tool...")
@@ -118,6 +208,51 @@ async def test_get_calendar_statistics():
         print(f"❌ get_calendar_statistics failed: {e}")
         return False
 
+async def test_find_conflicts():
+    """Test find_conflicts tool, in both slot and range mode"""
+    print("\n⚔️ Testing find_conflicts tool...")
+    try:
+        result = await handle_call_tool("find_conflicts", {"start_time": "2025-07-04 10:00:00", "end_time": "2025-07-04 11:00:00"})
+        print(f"✅ Slot check result: {result[0].text[:200]}")
+        result = await handle_call_tool("find_conflicts", {"from": "2025-07-01", "to": "2025-08-01", "limit": 3})
+        print(f"✅ Range scan result: {result[0].text[:200]}")
+        return not result[0].text.startswith("❌")
+    except Exception as e:
+        print(f"❌ find_conflicts failed: {e}")
+        return False
+
+async def test_find_free_slots():
+    """Test find_free_slots tool"""
+    print("\n🟢 Testing find_free_slots tool...")
+    try:
+        result = await handle_call_tool("find_free_slots", {"duration_minutes": 90, "day_start": "09:00", "day_end": "17:00"})
+        print(f"✅ find_free_slots result: {result[0].text[:300]}")
+        return not result[0].text.startswith("❌")
+    except Exception as e:
+        print(f"❌ find_free_slots failed: {e}")
+        return False
+
+async def test_invalid_arguments():
+    """Test that arguments not matching a tool's input schema are rejected before any API call"""
+    print("\n🚫 Testing argument validation...")
+    try:
+        cases = [
+            ("get_event", {}),
+            ("get_all_events", {"category": "Party"}),
+            ("get_upcoming_events", {"limit": 0}),
+            ("create_event", {"name": "No times", "category": "Lecture", "level": 2}),
+        ]
+        for name, arguments in cases:
+            result = await handle_call_tool(name, arguments)
+            if not result[0].text.startswith("❌ Error: Invalid arguments"):
+                print(f"❌ {name}({arguments}) was not rejected: {result[0].text[:100]}")
+                return False
+        print(f"✅ Rejected {len(cases)} invalid calls, e.g. {result[0].text}")
+        return True
+    except Exception as e:
+        print(f"❌ Argument validation test failed: {e}")
+        return False
+
 async def main():
     """Run all tests"""
     print("🎓 Redwood Digital University Calendar MCP Server Test Suite")
@@ -129,9 +264,15 @@ async def main():
         test_get_all_events,
         test_get_event,
         test_create_event,
+        test_recurring_event,
+        test_update_events,
+        test_batch_validation,
         test_search_events,
         test_get_upcoming_events,
-        test_get_calendar_statistics
+        test_get_calendar_statistics,
+        test_find_conflicts,
+        test_find_free_slots,
+        test_invalid_arguments
     ]
     
     passed = 0
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Resilience tests for the Calendar MCP Server's API client: timeouts, retries, the circuit breaker,
+request coalescing and the change feed, run against a local fault-injecting stub of the Calendar API
+"""
+import asyncio
+import time
+from aiohttp import web
+
+import server
+
+STUB_PORT = 8799
+
+class FaultyAPI:
+    """Stub Calendar API that fails, stalls or answers on demand and counts requests"""
+    def __init__(self):
+        self.fail_next = 0      # Answer this many requests with 503
+        self.fail_always = False
+        self.delay = 0.0        # Seconds to stall before answering
+        self.requests = 0
+        self.feed_since = []    # `since` of each change stream connection
+        self.deleted = set()    # Paths already deleted; deleting them again answers 404
+        self.cached_on_reconnect = None
+
+    async def handle(self, request):
+        self.requests += 1
+        if request.path == "/schedules/changes/stream":
+            return await self.change_stream(request)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if request.method == "DELETE":
+            if request.path in self.deleted:
+                return web.json_response({"detail": "Schedule not found"}, status=404)
+            self.deleted.add(request.path)
+        if self.fail_always or self.fail_next > 0:
+            self.fail_next -= 1
+            return web.json_response({"detail": "unavailable"}, status=503)
+        if request.method == "POST":
+            return web.json_response(await request.json())
+        return web.json_response({"app_name": "calendar"})
+
+    async def change_stream(self, request):
+        """Sends one change and hangs up; resuming after it finds the log has moved on (410)"""
+        since = request.query.get("since")
+        self.feed_since.append(since)
+        if since == "6":
+            self.cached_on_reconnect = [key[0] for key in server.schedule_cache.entries]
+            return web.json_response({"detail": "gone"}, status=410)
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        await response.write(b'event: ready\ndata: {"since": 5}\n\n')
+        if since is None and len(self.feed_since) == 1:
+            await response.write(b'id: 6\nevent: change\ndata: {"seq": 6, "sid": "a", "op": "delete", "row": null}\n\n')
+        return response
+
+    def reset(self):
+        self.fail_next, self.fail_always, self.delay, self.requests = 0, False, 0.0, 0
+        self.feed_since, self.cached_on_reconnect = [], None
+        self.deleted = set()
+
+async def start_stub(api):
+    app = web.Application()
+    app.router.add_route("*", "/{path:.*}", api.handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", STUB_PORT).start()
+    return runner
+
+def configure(retries=2, timeout=1.0, threshold=5, cooldown=0.5):
+    server.CALENDAR_API_RETRIES = retries
+    server.CALENDAR_API_TIMEOUT = timeout
+    server.CALENDAR_API_RETRY_BACKOFF = 0.01
+    server.circuit_breaker = server.CircuitBreaker(threshold, cooldown)
+
+async def test_timeout(api):
+    """A stalled API fails the call after the configured timeout"""
+    print("⏱️  Testing request timeout...")
+    configure(retries=0, timeout=0.3)
+    api.delay = 2.0
+    start = time.monotonic()
+    try:
+        await server.make_calendar_api_request("GET", "/timeout")
+        print("❌ Stalled request did not time out")
+        return False
+    except server.CalendarAPIError as e:
+        elapsed = time.monotonic() - start
+        print(f"✅ Timed out after {elapsed:.2f}s: {e}")
+        return elapsed < 1.0
+
+async def test_get_retried(api):
+    """Transient failures of idempotent requests are retried"""
+    print("🔁 Testing retry of GET...")
+    configure(retries=2)
+    api.fail_next = 2
+    result = await server.make_calendar_api_request("GET", "/retry")
+    print(f"✅ GET succeeded after {api.requests} attempts: {result}")
+    return api.requests == 3
+
+async def test_post_not_retried(api):
+    """Non-idempotent requests are sent once"""
+    print("📮 Testing POST is not retried...")
+    configure(retries=2)
+    api.fail_next = 1
+    try:
+        await server.make_calendar_api_request("POST", "/schedules", {"sid": "x"})
+        print("❌ POST unexpectedly succeeded")
+        return False
+    except server.CalendarAPIError as e:
+        print(f"✅ POST failed after {api.requests} attempt: {e}")
+        return api.requests == 1 and e.status == 503
+
+async def test_delete_retried(api):
+    """A DELETE whose response is lost is retried; the retry's 404 means the first attempt deleted it"""
+    print("🗑️ Testing a retried DELETE...")
+    configure(retries=2)
+    api.fail_next = 1  # The event is deleted, but the response is a 503
+    result = await server.make_calendar_api_request("DELETE", "/schedules/lost-response")
+    try:
+        await server.make_calendar_api_request("DELETE", "/schedules/lost-response")
+        missing_reported = False
+    except server.CalendarAPIError as e:
+        missing_reported = e.status == 404
+    print(f"✅ Retried DELETE: {result} after {api.requests} requests; a fresh DELETE of it reports 404: {missing_reported}")
+    return api.requests == 3 and "deleted" in result["message"] and missing_reported
+
+async def test_circuit_breaker(api):
+    """The breaker opens after repeated failures, fails fast, and closes after a successful probe"""
+    print("🔌 Testing circuit breaker...")
+    configure(retries=0, threshold=3, cooldown=0.5)
+    api.fail_always = True
+    for _ in range(3):
+        try:
+            await server.make_calendar_api_request("GET", "/breaker")
+        except server.CalendarAPIError:
+            pass
+    sent = api.requests
+    try:
+        await server.make_calendar_api_request("GET", "/breaker")
+        print("❌ Open circuit let a request through")
+        return False
+    except server.CircuitOpenError as e:
+        print(f"✅ Failed fast while open ({server.circuit_breaker.state}): {e}")
+    if api.requests != sent:
+        print("❌ Open circuit still reached the API")
+        return False
+
+    # A failed probe re-opens the circuit
+    await asyncio.sleep(0.6)
+    try:
+        await server.make_calendar_api_request("GET", "/breaker")
+    except server.CalendarAPIError:
+        pass
+    if server.circuit_breaker.state != "open":
+        print(f"❌ Failed probe left the circuit {server.circuit_breaker.state}")
+        return False
+
+    # A successful probe closes it
+    await asyncio.sleep(0.6)
+    api.fail_always = False
+    await server.make_calendar_api_request("GET", "/breaker")
+    print(f"✅ Probe succeeded, circuit {server.circuit_breaker.state}")
+    return server.circuit_breaker.state == "closed"
+
+async def test_coalescing(api):
+    """Concurrent identical GETs share one request; different ones don't"""
+    print("🔗 Testing request coalescing...")
+    configure()
+    api.delay = 0.2
+    before = server.single_flight.coalesced
+    results = await asyncio.gather(*(server.make_calendar_api_request("GET", "/coalesce") for _ in range(20)),
+                                   server.make_calendar_api_request("GET", "/coalesce", params={"other": 1}))
+    coalesced = server.single_flight.coalesced - before
+    print(f"✅ 21 concurrent GETs sent {api.requests} requests ({coalesced} coalesced)")
+    return api.requests == 2 and coalesced == 19 and all(r == results[0] for r in results)
+
+async def test_write_during_get(api):
+    """A GET overtaken by a write must not cache its (possibly pre-write) body"""
+    print("🏁 Testing a write racing an in-flight GET...")
+    configure()
+    cache = server.schedule_cache
+    cache.clear()
+    api.delay = 0.2
+    listing = asyncio.create_task(server.make_calendar_api_request("GET", "/schedules"))
+    await asyncio.sleep(0.05)
+    # A write completing while the listing is in flight
+    cache.invalidate("POST", "/schedules", {"sid": "raced"})
+    await listing
+    raced = cache.key("/schedules") in cache.entries
+    api.delay = 0.0
+    await server.make_calendar_api_request("GET", "/schedules")
+    kept = cache.key("/schedules") in cache.entries
+    print(f"✅ Listing cached after the racing write: {raced}; cached by the next GET: {kept}")
+    return not raced and kept
+
+async def test_change_feed(api):
+    """A change from the stream evicts only its event; falling behind the log clears the cache"""
+    print("📰 Testing the change feed...")
+    configure()
+    server.CALENDAR_API_RETRY_MAX_BACKOFF = 0.05
+    cache = server.schedule_cache
+    cache.clear()
+    cache.store(cache.key("/schedules/a"), [{"sid": "a"}])
+    cache.store(cache.key("/schedules/b"), [{"sid": "b"}])
+    task = asyncio.create_task(server.follow_change_feed())
+    try:
+        for _ in range(200):
+            if len(api.feed_since) >= 3:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        task.cancel()
+    print(f"✅ Connected with since={api.feed_since[:3]}, cached on resume: {api.cached_on_reconnect}, "
+          f"after the 410: {len(cache.entries)} entries")
+    return (api.feed_since[:3] == [None, "6", None] and api.cached_on_reconnect == ["/schedules/b"]
+            and not cache.entries)
+
+async def main():
+    print("🧪 Calendar API Client Resilience Tests")
+    print("=" * 60)
+    server.CALENDAR_API_BASE_URL = f"http://127.0.0.1:{STUB_PORT}"
+    server.schedule_cache.ttl = 0
+    api = FaultyAPI()
+    runner = await start_stub(api)
+
+    tests = [test_timeout, test_get_retried, test_post_not_retried, test_delete_retried, test_circuit_breaker, test_coalescing, test_write_during_get, test_change_feed]
+    passed = 0
+    try:
+        for test in tests:
+            api.reset()
+            try:
+                if await test(api):
+                    passed += 1
+            except Exception as e:
+                print(f"❌ {test.__name__} raised: {e}")
+            print()
+    finally:
+        await runner.cleanup()
+
+    print("=" * 60)
+    print(f"📈 Test Results: {passed}/{len(tests)} tests passed")
+    if passed == len(tests):
+        print("🎉 All resilience tests passed!")
+    else:
+        print("⚠️  Some tests failed.")
+
+if __name__ == "__main__":
+    asyncio.run(main())